@@ -0,0 +1,25 @@
+"""Code Structure Analyzer package."""
+
+import importlib
+from typing import Any
+
+__version__ = '0.2.1'
+
+__all__ = ['analyze_codebase', 'BaseAnalysisReporter', 'MarkdownAnalysisReporter']
+
+# Public names are resolved on first access, so importing a submodule such as
+# csa.cli does not pull in the analyzer and its reporter backends
+_LAZY_EXPORTS = {
+    'analyze_codebase': 'csa.analyzer',
+    'BaseAnalysisReporter': 'csa.reporters',
+    'MarkdownAnalysisReporter': 'csa.reporters',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,766 @@
+import argparse
+import atexit
+import functools
+import logging
+import logging.config
+import os
+import queue
+import re
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from typing import Iterator, List, Optional, Tuple
+
+from csa.config import config, url_to_host_port
+from csa.llm import (
+    LMStudioProvider,
+    LMStudioWebsocketError,
+    OllamaError,
+    OllamaProvider,
+)
+
+logger = logging.getLogger(__name__)
+_ROOT_LOGGER = logging.getLogger()
+
+
+class _NoisyLoggerFilter(logging.Filter):
+    """Drop websocket and HTTP client records unless logging is verbose."""
+
+    # lmstudio names its loggers after its classes
+    PREFIXES = (
+        'AsyncWebsocket',
+        '_AsyncWebsocketThread',
+        'SyncLMStudioWebsocket',
+        'SyncToAsyncWebsocketBridge',
+        'httpx',
+    )
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.verbose = False
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return self.verbose or not record.name.startswith(self.PREFIXES)
+
+
+_NOISY_FILTER = _NoisyLoggerFilter()
+
+TITLE = """
+###################################################
+#       Code Structure Analyzer (CSA)             #
+#       Generate documentation for codebases      #
+###################################################
+
+"""
+
+_EPILOG_TEXT = """
+Examples:
+  # Analyze the current directory with default settings
+  python -m csa.cli .
+
+  # Analyze a specific directory with a custom output file
+  python -m csa.cli /path/to/source -o analysis.md
+
+  # Analyze a specific directory and store results in a ChromaDB vector database
+  python -m csa.cli /path/to/source --reporter chromadb --output data/chroma
+
+  # Analyze with a larger chunk size (for processing more lines at once)
+  python -m csa.cli /path/to/source -c 200
+
+  # Use a specific LLM host (for LM Studio)
+  python -m csa.cli /path/to/source --llm-host localhost:5000
+
+  # Use Ollama as the LLM provider with specific host and model
+  python -m csa.cli /path/to/source --llm-provider ollama --ollama-host localhost:11434 --ollama-model qwen2.5-coder:14b
+
+  # Include only specific file patterns
+  python -m csa.cli /path/to/source --include "*.cs,*.py"
+
+  # Exclude specific file patterns
+  python -m csa.cli /path/to/source --exclude "test_*.py,*.tmp"
+
+  # Obey .gitignore files in the processed folder
+  python -m csa.cli /path/to/source --obey-gitignore
+
+  # Disable dependencies/imports in the output
+  python -m csa.cli /path/to/source --no-dependencies
+
+  # Disable functions list in the output
+  python -m csa.cli /path/to/source --no-functions
+"""
+
+_SUPPORTED_PROVIDERS = frozenset({'lmstudio', 'ollama'})
+
+# hostname:port format accepted by validate_host_format() besides http(s) URLs
+_HOST_PORT_RE = re.compile(r'^[a-zA-Z0-9.-]+:[0-9]+$')
+
+# Seconds a host reachability result stays valid
+REACHABILITY_CACHE_TTL = 5.0
+_reachability_cache: dict[Tuple[str, int], Tuple[float, bool]] = {}
+
+# Values of CSA_LOG_FILE that turn the log file off
+_LOG_FILE_DISABLED = frozenset({'', '0', 'false', 'no', 'off'})
+
+# Set once _configure_logging() has installed the handlers
+_logging_configured = False
+# Background writer for the log file, started on the first analysis run
+_log_listener: Optional[QueueListener] = None
+
+
+@functools.lru_cache(maxsize=1)
+def create_parser():
+    """
+    Create the command-line argument parser with custom help text.
+
+    The parser is built once and reused, so help and error paths do not
+    rebuild it. Defaults are taken from ``config`` at that point; call
+    ``create_parser.cache_clear()`` after reloading the configuration.
+    """
+    # Read each configured default once
+    default_output = config.OUTPUT_FILE
+    default_chunk_size = config.CHUNK_SIZE
+    default_provider = config.LLM_PROVIDER
+    default_lmstudio_host = config.LMSTUDIO_HOST
+    default_ollama_host = config.OLLAMA_HOST
+    default_ollama_model = config.OLLAMA_MODEL
+    default_obey_gitignore = config.OBEY_GITIGNORE
+
+    parser = argparse.ArgumentParser(
+        description='Code Structure Analyzer - Generate structured documentation for codebases',
+        add_help=False,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_EPILOG_TEXT,
+    )
+    parser.add_argument(
+        '-h', '--help', action='help', help='Show this help message and examples.'
+    )
+    parser.add_argument(
+        '--folders',
+        action='store_true',
+        help='Recursively include files in sub-folders of the source directory.',
+    )
+
+    parser.add_argument(
+        'source_dir',
+        nargs='?',
+        default=None,
+        help='Path to the source directory to analyze',
+    )
+
+    parser.add_argument(
+        '-o',
+        '--output',
+        help='Path to the output markdown file or chromadb directory (default: %(default)s)',
+        default=default_output,
+    )
+
+    parser.add_argument(
+        '--reporter',
+        help='Reporter type to use (markdown or chromadb)',
+        choices=['markdown', 'chromadb'],
+        default='markdown',
+    )
+
+    parser.add_argument(
+        '-c',
+        '--chunk-size',
+        help='Number of lines to read in each chunk (default: %(default)s)',
+        type=int,
+        default=default_chunk_size,
+    )
+
+    parser.add_argument(
+        '--llm-provider',
+        help='LLM provider to use (default: %(default)s)',
+        type=str.lower,
+        choices=sorted(_SUPPORTED_PROVIDERS),
+        default=default_provider,
+    )
+
+    parser.add_argument(
+        '--llm-host',
+        help='Legacy host for selected provider (fallback only when provider-specific host is not explicitly set)',
+        default=None,
+    )
+
+    parser.add_argument(
+        '--lmstudio-host',
+        help=f'Host address for the LM Studio provider (default: {default_lmstudio_host}); overrides --llm-host',
+        default=None,
+    )
+
+    parser.add_argument(
+        '--ollama-host',
+        help=f'Host address for Ollama (default: {default_ollama_host}); overrides --llm-host',
+        default=None,
+    )
+
+    parser.add_argument(
+        '--ollama-model',
+        help='Model name for Ollama (default: %(default)s)',
+        default=default_ollama_model,
+    )
+
+    parser.add_argument(
+        '--include',
+        help='Comma-separated list in double quotes of file patterns to include (gitignore style)',
+        type=_csv_patterns,
+        default=None,
+    )
+
+    parser.add_argument(
+        '--exclude',
+        help='Comma-separated list in double quotes of file patterns to exclude (gitignore style)',
+        type=_csv_patterns,
+        default=None,
+    )
+
+    parser.add_argument(
+        '--obey-gitignore',
+        action='store_true',
+        help='Whether to obey .gitignore files in the processed folder (default: %(default)s)',
+        default=default_obey_gitignore,
+    )
+
+    parser.add_argument(
+        '--no-dependencies',
+        action='store_true',
+        help='Disable output of dependencies/imports in the analysis',
+        default=False,
+    )
+
+    parser.add_argument(
+        '--no-functions',
+        action='store_true',
+        help='Disable output of functions list in the analysis',
+        default=False,
+    )
+
+    parser.add_argument(
+        '--verbose', '-v', action='store_true', help='Enable verbose logging'
+    )
+
+    return parser
+
+
+def parse_args() -> Tuple[argparse.Namespace, argparse.ArgumentParser]:
+    """
+    Parse command-line arguments.
+
+    Returns:
+        Tuple of (parsed arguments, parser used to parse them)
+    """
+    parser = create_parser()
+    args = parser.parse_args()
+
+    # If source_dir is None but we have other args, print a friendly message about arg order
+    if args.source_dir is None and len(sys.argv) > 1:
+        print(
+            "\nNOTE: When using flags with cli.py, make sure to specify the source directory last or use '.' for current directory"
+        )
+        print('Example: python cli.py --no-dependencies -o output.md .\n')
+
+    return args, parser
+
+
+def check_dependencies():
+    """Check for required dependencies and show warnings."""
+    try:
+        import pathspec  # noqa: F401
+
+        return True
+    except ImportError:
+        print('WARNING: pathspec is not installed. Please install it using:')
+        print('pip install pathspec>=0.12.1')
+        print('Gitignore-style pattern matching will be limited without it.')
+        return False
+
+
+def check_host_reachable(host, port, timeout=0.3):
+    """
+    Check if a host:port is reachable.
+
+    Results are cached for a few seconds per (host, port) so repeated checks
+    of the same endpoint do not pay for another TCP handshake.
+
+    Args:
+        host: Hostname or IP address
+        port: Port number
+        timeout: Connection timeout in seconds
+
+    Returns:
+        bool: True if reachable, False otherwise
+    """
+    try:
+        key = (host, int(port))
+    except (TypeError, ValueError):
+        return False
+
+    now = time.monotonic()
+    cached = _reachability_cache.get(key)
+    if cached is not None and now - cached[0] < REACHABILITY_CACHE_TTL:
+        return cached[1]
+
+    try:
+        with socket.create_connection(key, timeout=timeout):
+            pass
+        reachable = True
+    except Exception:
+        reachable = False
+
+    _reachability_cache[key] = (now, reachable)
+    return reachable
+
+
+def _parse_patterns(value: str) -> Tuple[List[str], List[str]]:
+    """
+    Split a comma-separated --include/--exclude value in a single pass.
+
+    Entries are stripped and empty ones (e.g. from a trailing comma) are
+    dropped. Entries starting with '-' are most likely options that were
+    swallowed by a quoting mistake and are returned separately.
+
+    Args:
+        value: The raw option value
+
+    Returns:
+        Tuple of (patterns, invalid_patterns)
+    """
+    patterns: List[str] = []
+    invalid_patterns: List[str] = []
+    for pattern in map(str.strip, value.split(',')):
+        if pattern:
+            (invalid_patterns if pattern.startswith('-') else patterns).append(pattern)
+    return patterns, invalid_patterns
+
+
+def _csv_patterns(value: str) -> List[str]:
+    """
+    Argparse type for --include/--exclude: a comma-separated pattern list.
+
+    Args:
+        value: The raw option value
+
+    Returns:
+        List of stripped, non-empty patterns
+
+    Raises:
+        argparse.ArgumentTypeError: If an entry looks like a swallowed CLI flag
+    """
+    patterns, invalid_patterns = _parse_patterns(value)
+    if invalid_patterns:
+        raise argparse.ArgumentTypeError(
+            f"invalid pattern(s) {', '.join(invalid_patterns)}. It looks like some CLI "
+            'flags were captured inside the value. Wrap the patterns in quotes and '
+            'place other flags AFTER them, e.g. --include "*.cs" --folders -o out.md'
+        )
+    return patterns
+
+
+def validate_host_format(host_value: str) -> Tuple[bool, Optional[str], Optional[str]]:
+    """
+    Validate and potentially convert host format.
+
+    Args:
+        host_value: The host string to validate
+
+    Returns:
+        Tuple containing:
+        - Boolean indicating if format is valid
+        - Converted host string if successful, None otherwise
+        - Error message if validation failed, None otherwise
+    """
+    # Check for URL format (http(s)://hostname[:port][/path])
+    if host_value.startswith(('http://', 'https://')):
+        hostname_port = url_to_host_port(host_value)
+        if hostname_port is None:
+            return False, None, f'Invalid URL format: {host_value}'
+        return (
+            True,
+            hostname_port,
+            f'Converting URL format to hostname:port format: {host_value} -> {hostname_port}',
+        )
+    # Check for hostname:port format
+    if not _HOST_PORT_RE.match(host_value):
+        return False, None, f'Invalid host format: {host_value}'
+
+    # Already in correct format
+    return True, host_value, None
+
+
+def validate_and_resolve_host(
+    host_value: str, host_type: str, check_reachable: bool = False
+) -> Tuple[bool, Optional[str]]:
+    """
+    Validate a host value, convert if needed, and set in environment.
+
+    Args:
+        host_value: The host value to validate and normalize
+        host_type: Type of host for error messages
+        check_reachable: Whether to check if the host is reachable
+
+    Returns:
+        Tuple of (success, normalized_host)
+    """
+    is_valid, converted_host, message = validate_host_format(host_value)
+
+    if not is_valid:
+        print(f'\nERROR: {message}')
+        print(
+            f"Host should be in the format 'hostname:port' (e.g., 'localhost:{1234 if host_type == 'LMStudio' else 11434}')"
+        )
+        print("Or a valid URL (e.g., 'http://localhost:1234')")
+        return False, None
+
+    resolved_host = converted_host if converted_host is not None else host_value
+
+    if message and converted_host is not None:
+        print(f'\nWARNING: {message}')
+
+    # Check if host is reachable (optional early warning)
+    if check_reachable:
+        host, _, port = resolved_host.partition(':')
+        if not check_host_reachable(host, port):
+            print(f'\nWARNING: Cannot connect to {host_type} provider at {resolved_host}')
+            print('Make sure the service is running and accessible.')
+            print('Continuing execution, but analysis may fail later.\n')
+            logger.warning('%s host %s is not reachable', host_type, resolved_host)
+
+    return True, resolved_host
+
+
+@contextmanager
+def _cancel_on_sigint(cancel_event: threading.Event) -> Iterator[None]:
+    """
+    Route CTRL+C (and CTRL+BREAK on Windows) to the cancellation event.
+
+    The first interrupt sets the event so the analysis can stop cleanly; a
+    second one raises KeyboardInterrupt to abort immediately. The previous
+    handlers are restored on exit. Outside the main thread no handler can be
+    installed and the block runs unchanged.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    interrupt_key = 'CTRL+BREAK' if os.name == 'nt' else 'CTRL+C'
+
+    def handle_interrupt(signum, frame):
+        if cancel_event.is_set():
+            raise KeyboardInterrupt
+        print('\nReceived keyboard interrupt, stopping analysis...')
+        print(f'Press {interrupt_key} again to abort immediately.')
+        cancel_event.set()
+
+    signals = [signal.SIGINT]
+    if hasattr(signal, 'SIGBREAK'):
+        signals.append(signal.SIGBREAK)
+    previous_handlers = {sig: signal.signal(sig, handle_interrupt) for sig in signals}
+    try:
+        yield
+    finally:
+        for sig, previous_handler in previous_handlers.items():
+            signal.signal(sig, previous_handler)
+
+
+def _configure_logging(verbose: bool = False) -> None:
+    """
+    Attach the console and log file handlers to the root logger.
+
+    The log file is csa.log unless the CSA_LOG_FILE environment variable
+    names another path; setting it to 0/false/no/off (or empty) disables
+    file logging. Handlers are installed on the first call only; later calls
+    just apply the requested level.
+
+    Args:
+        verbose: Whether to log at DEBUG instead of INFO
+    """
+    global _logging_configured, _log_listener
+    root_logger = _ROOT_LOGGER
+    if not _logging_configured:
+        _logging_configured = True
+        log_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        # Keep an existing console handler (e.g. the tqdm-aware one)
+        if not root_logger.handlers:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(log_formatter)
+            root_logger.addHandler(console_handler)
+
+        log_file = os.environ.get('CSA_LOG_FILE', 'csa.log')
+        if log_file.strip().lower() not in _LOG_FILE_DISABLED:
+            # The log file is written by a listener thread, so logging threads
+            # only enqueue records instead of blocking on disk writes; the
+            # file writes themselves are batched and flushed early on errors
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setFormatter(log_formatter)
+            buffered_handler = MemoryHandler(
+                capacity=512,
+                flushLevel=logging.ERROR,
+                target=file_handler,
+                flushOnClose=True,
+            )
+            atexit.register(buffered_handler.close)
+            log_queue: queue.Queue = queue.Queue(-1)
+            _log_listener = QueueListener(log_queue, buffered_handler)
+            _log_listener.start()
+            # Registered last so it runs first: drain the queue, then flush
+            atexit.register(_log_listener.stop)
+            root_logger.addHandler(QueueHandler(log_queue))
+
+    # Incremental mode only adjusts levels; it leaves the handlers installed
+    # above (and any tqdm-aware console handler) alone
+    level = 'DEBUG' if verbose else 'INFO'
+    logging.config.dictConfig({'version': 1, 'incremental': True, 'root': {'level': level}})
+    _NOISY_FILTER.verbose = verbose
+    for handler in root_logger.handlers:
+        handler.setLevel(level)
+        handler.addFilter(_NOISY_FILTER)
+
+
+def _run_in_daemon_thread(func, **kwargs):
+    """
+    Call ``func(**kwargs)`` in a daemon thread and return its result.
+
+    Used on Windows, where CTRL+C/CTRL+BREAK is delivered unreliably to a main
+    thread that is busy in native code and an untimed join() cannot be
+    interrupted. The main thread wakes up once a second so signal handlers
+    can run. Exceptions raised by ``func`` are re-raised in the caller.
+    """
+    outcome = {}
+
+    def target():
+        try:
+            outcome['value'] = func(**kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    while thread.is_alive():
+        thread.join(1.0)
+
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome.get('value')
+
+
+def main():
+    """Run the code structure analyzer with command-line arguments."""
+
+    # Answer -h/--help before any other setup work is done
+    if any(arg in ('-h', '--help') for arg in sys.argv[1:]):
+        sys.stdout.write(TITLE)
+        create_parser().print_help()
+        return 0
+
+    # Create a cancellation event
+    cancel_event = threading.Event()
+
+    selected_lmstudio_host = config.LMSTUDIO_HOST
+    selected_ollama_host = config.OLLAMA_HOST
+    selected_ollama_model = config.OLLAMA_MODEL
+
+    try:
+        # Print title first
+        sys.stdout.write(TITLE)
+        args, parser = parse_args()
+
+        # If no source directory is provided, print help and exit with error message
+        if args.source_dir is None:
+            print("\nERROR: Missing required argument 'source_dir'")
+            print('Please specify a source directory to analyze.\n')
+            parser.print_help()
+            return 1
+
+        # Configure logging only once we know an analysis will run, so that
+        # help and usage errors do not create or touch csa.log
+        _configure_logging(verbose=args.verbose)
+
+        # Check dependencies in the background so the import overlaps with
+        # host validation and the optional reachability probe below
+        dependency_executor = ThreadPoolExecutor(max_workers=1)
+        dependency_check = dependency_executor.submit(check_dependencies)
+        dependency_executor.shutdown(wait=False)
+
+        # Check that source_dir is a directory before proceeding
+        source_dir = os.path.abspath(args.source_dir)
+        if not os.path.isdir(source_dir):
+            if os.path.exists(source_dir):
+                logger.error('Error: Source path is not a directory: %s', source_dir)
+                raise NotADirectoryError(f'Source path is not a directory: {source_dir}')
+            logger.error('Error: Source directory not found: %s', source_dir)
+            raise FileNotFoundError(f'Source directory not found: {source_dir}')
+
+        selected_provider = args.llm_provider
+        selected_lmstudio_host = config.LMSTUDIO_HOST
+        selected_ollama_host = config.OLLAMA_HOST
+        selected_ollama_model = args.ollama_model or config.OLLAMA_MODEL
+
+        # Validate every supplied host in one pass; a value given for several
+        # options is validated (and probed) only once. Only the legacy
+        # --llm-host is checked for reachability.
+        legacy_host_type = 'Ollama' if selected_provider == 'ollama' else 'LMStudio'
+        host_options = (
+            ('legacy', args.llm_host, legacy_host_type, True),
+            ('lmstudio', args.lmstudio_host, 'LMStudio', False),
+            ('ollama', args.ollama_host, 'Ollama', False),
+        )
+        validated_hosts: dict[str, str] = {}
+        resolved_hosts: dict[str, str] = {}
+        for option, host_value, host_type, check_reachable in host_options:
+            if not host_value:
+                continue
+            if host_value not in validated_hosts:
+                valid_host, resolved_host = validate_and_resolve_host(
+                    host_value, host_type, check_reachable=check_reachable
+                )
+                if not valid_host or resolved_host is None:
+                    return 1
+                validated_hosts[host_value] = resolved_host
+            resolved_hosts[option] = validated_hosts[host_value]
+
+        # Provider-specific hosts take precedence over the legacy --llm-host
+        legacy_host = resolved_hosts.get('legacy')
+        if 'lmstudio' in resolved_hosts:
+            selected_lmstudio_host = resolved_hosts['lmstudio']
+        elif selected_provider == 'lmstudio' and legacy_host:
+            selected_lmstudio_host = legacy_host
+
+        if 'ollama' in resolved_hosts:
+            selected_ollama_host = resolved_hosts['ollama']
+        elif selected_provider == 'ollama' and legacy_host:
+            selected_ollama_host = legacy_host
+
+        dependency_check.result()
+
+        # Imported only now: the analyzer pulls in the reporter backends
+        # (chromadb), which is slow and not needed for help or usage errors
+        from csa.analyzer import analyze_codebase
+
+        if selected_provider == 'lmstudio':
+            llm_provider = LMStudioProvider(host=selected_lmstudio_host)
+        else:
+            llm_provider = OllamaProvider(
+                host=selected_ollama_host, model=selected_ollama_model
+            )
+
+        output_file = args.output
+
+        # Emit the startup summary as a single record
+        if logger.isEnabledFor(logging.INFO):
+            banner = [
+                '\nStarting Code Structure Analyzer',
+                f'Source directory: {args.source_dir}',
+                f'Results will be stored in ChromaDB at {output_file}'
+                if args.reporter == 'chromadb'
+                else f'Results will be written to {output_file}',
+                f'Chunk size: {args.chunk_size}',
+                f'LLM provider: {selected_provider}',
+                f'LLM host: {selected_ollama_host if selected_provider == "ollama" else selected_lmstudio_host}',
+            ]
+            if selected_provider == 'ollama':
+                banner.append(f'Ollama host: {selected_ollama_host}')
+                banner.append(f'Ollama model: {selected_ollama_model}')
+            banner.append(f'Obey .gitignore: {args.obey_gitignore}')
+            if args.no_dependencies:
+                banner.append('Dependencies/imports output is disabled')
+            if args.no_functions:
+                banner.append('Functions list output is disabled')
+            if args.include:
+                banner.append(f"Include patterns: {', '.join(args.include)}")
+            if args.exclude:
+                banner.append(f"Exclude patterns: {', '.join(args.exclude)}")
+            logger.info('\n'.join(banner))
+
+        # Print a message about cancellation support
+        print(
+            f"\nPress {'CTRL+BREAK' if os.name == 'nt' else 'CTRL+C'} at any time to stop the analysis.\n"
+        )
+
+        analysis_kwargs = dict(
+            source_dir=source_dir,
+            output_file=output_file,
+            chunk_size=args.chunk_size,
+            include_patterns=args.include,
+            exclude_patterns=args.exclude,
+            obey_gitignore=args.obey_gitignore,
+            llm_provider=llm_provider,
+            disable_dependencies=args.no_dependencies,
+            disable_functions=args.no_functions,
+            cancel_callback=cancel_event.is_set,
+            folders=args.folders,
+            reporter_type=args.reporter,
+        )
+
+        # CTRL+C only flags cancellation, which the analyzer checks between
+        # chunks and files
+        with _cancel_on_sigint(cancel_event):
+            try:
+                if os.name == 'nt':
+                    output = _run_in_daemon_thread(analyze_codebase, **analysis_kwargs)
+                else:
+                    output = analyze_codebase(**analysis_kwargs)
+            except Exception:
+                # A run that was asked to stop may end with an error; it is
+                # still reported as a cancellation
+                if not cancel_event.is_set():
+                    raise
+                output = None
+
+        if cancel_event.is_set():
+            logger.info('Analysis was cancelled by user')
+            return 1
+        if not output:
+            raise RuntimeError('Analysis finished without producing any output')
+
+        logger.info('Analysis completed. Output written to %s', output)
+        return 0
+
+    except KeyboardInterrupt:
+        print('\nAnalysis interrupted by user')
+        cancel_event.set()
+        return 1
+
+    except FileNotFoundError:
+        logger.error('Error: Source directory not found: %s', args.source_dir)
+        raise
+
+    except NotADirectoryError:
+        raise
+
+    except ImportError as e:
+        logger.error('Error: %s', e)
+        print(f'\nError: Missing required dependency: {str(e)}')
+        print(
+            'Please install missing dependencies using pip install -r requirements.txt'
+        )
+        return 1
+
+    except LMStudioWebsocketError as e:
+        logger.error('Error connecting to LM Studio: %s', e)
+        print(f'\nError: Unable to connect to LM Studio at {selected_lmstudio_host}')
+        print('Please make sure LM Studio is running and accessible.')
+        print('You can start LM Studio or use a different LLM provider.')
+        return 1
+
+    except OllamaError as e:
+        logger.error('Error connecting to Ollama: %s', e)
+        print(f'\nError: Unable to connect to Ollama at {selected_ollama_host}')
+        print('Please make sure Ollama is running and accessible.')
+        print('You can start Ollama or use a different LLM provider.')
+        return 1
+
+    except Exception as e:
+        logger.error('Error: %s', e, exc_info=True)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,304 @@
+import os
+import re
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlsplit
+
+import dotenv
+
+# Host format accepted for LMSTUDIO_HOST/OLLAMA_HOST (URLs are converted)
+_HOST_PORT_RE = re.compile(r'^[a-zA-Z0-9.-]+:[0-9]+$')
+_IS_WINDOWS = os.name == 'nt'
+_TRUE_VALUES = frozenset({'true', 'yes', '1'})
+
+
+def url_to_host_port(url: str) -> Optional[str]:
+    """
+    Convert an http(s) URL to hostname:port format.
+
+    Args:
+        url: URL such as 'http://localhost:1234/v1'
+
+    Returns:
+        'hostname:port', with the scheme's default port if none is given,
+        or None if the URL has no valid hostname or port
+    """
+    parts = urlsplit(url)
+    try:
+        host, port = parts.hostname, parts.port
+    except ValueError:
+        # The port is not a number or out of range
+        return None
+    # IPv6 literals cannot be expressed in the hostname:port format
+    if not host or ':' in host:
+        return None
+    if port is None:
+        port = 443 if parts.scheme == 'https' else 80
+    return f'{host}:{port}'
+
+
+def _file_mtime(path: str) -> Optional[float]:
+    """
+    Return the modification time of a file.
+
+    Args:
+        path: File path (may be empty)
+
+    Returns:
+        The modification time, or None if the file does not exist
+    """
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+def _strtobool(value: str) -> bool:
+    """
+    Interpret an environment flag such as 'true', 'yes' or '1'.
+
+    Args:
+        value: Raw environment variable value
+
+    Returns:
+        True if the value is 'true', 'yes' or '1' (case-insensitive)
+    """
+    return value.strip().lower() in _TRUE_VALUES
+
+
+class Config:
+    """
+    Singleton configuration class for Code Structure Analyzer.
+    """
+
+    _instance = None
+    # Whether the .env file has been loaded into os.environ
+    _dotenv_loaded = False
+    # Path and modification time of the .env file at the last load
+    _dotenv_path = ''
+    _dotenv_mtime: Optional[float] = None
+
+    # Define supported LLM providers
+    SUPPORTED_PROVIDERS = ['lmstudio', 'ollama']
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Config, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _handle_host_format(
+        self, host_value: str, host_type: str, current_provider: str, default_host: str
+    ) -> str:
+        """
+        Helper method to handle host format validation and conversion.
+
+        Args:
+            host_value: The host value to validate
+            host_type: Type of host (e.g., 'LMStudio', 'Ollama')
+            current_provider: The provider the host belongs to (lowercase)
+            default_host: Default host value if validation fails
+
+        Returns:
+            Validated and potentially converted host value
+        """
+        # Hosts of the provider that is not selected are stored as provided
+        if self._llm_provider_lc != current_provider:
+            return host_value
+
+        # Handle URL format (e.g., http://localhost:1234)
+        if host_value.startswith(('http://', 'https://')):
+            hostname_port = url_to_host_port(host_value)
+            if hostname_port:
+                print(
+                    f'WARNING: Converting URL format to hostname:port format: {host_value} -> {hostname_port}'
+                )
+                return hostname_port
+
+        if not _HOST_PORT_RE.match(host_value):
+            # Log a warning but default to a valid host format
+            print(f'WARNING: Invalid {host_type} host format: {host_value}')
+            print(
+                f"Defaulting to '{default_host}'. Host should be in the format 'hostname:port'"
+            )
+            host_value = default_host
+
+        return host_value
+
+    def _initialize(self) -> None:
+        """Initialize configuration by loading environment variables."""
+        # Load environment variables from .env file (once per process, and
+        # again only if forced or if the file was modified since)
+        if not Config._dotenv_loaded or (
+            Config._dotenv_path
+            and _file_mtime(Config._dotenv_path) != Config._dotenv_mtime
+        ):
+            Config._dotenv_path = dotenv.find_dotenv()
+            Config._dotenv_mtime = _file_mtime(Config._dotenv_path)
+            dotenv.load_dotenv(Config._dotenv_path or None)
+            Config._dotenv_loaded = True
+
+        # LLM Provider Configuration
+        llm_provider = os.getenv('LLM_PROVIDER', 'lmstudio')
+        if llm_provider.lower() not in [p.lower() for p in self.SUPPORTED_PROVIDERS]:
+            # Log a warning but default to a supported provider
+            print(f'WARNING: Unsupported LLM provider: {llm_provider}')
+            print(
+                f"Defaulting to 'lmstudio'. Supported providers: {', '.join(self.SUPPORTED_PROVIDERS)}"
+            )
+            llm_provider = 'lmstudio'
+        self.LLM_PROVIDER = llm_provider
+        # Lowercased once for the provider comparisons below and in LLM_HOST
+        self._llm_provider_lc = llm_provider.lower()
+        self._is_ollama = self._llm_provider_lc == 'ollama'
+
+        # LMStudio Host - this value should be set in .env file
+        # Example in .env: LMSTUDIO_HOST=localhost:1234
+        lmstudio_host = os.getenv('LMSTUDIO_HOST', 'localhost:1234')
+        self.LMSTUDIO_HOST = self._handle_host_format(
+            lmstudio_host, 'LMStudio', 'lmstudio', 'localhost:1234'
+        )
+
+        # Ollama Host - this value should be set in .env file
+        # Example in .env: OLLAMA_HOST=localhost:11434
+        ollama_host = os.getenv('OLLAMA_HOST', 'localhost:11434')
+        self.OLLAMA_HOST = self._handle_host_format(
+            ollama_host, 'Ollama', 'ollama', 'localhost:11434'
+        )
+
+        # Ollama Model Configuration - this value should be set in .env file
+        # Example in .env: OLLAMA_MODEL=qwen2.5-coder:14b
+        self.OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'qwen2.5-coder:14b')
+
+        # Analysis Configuration
+        chunk_size = os.getenv('CHUNK_SIZE', '200')
+        try:
+            self.CHUNK_SIZE = int(chunk_size)
+        except ValueError:
+            print('WARNING: Invalid CHUNK_SIZE value. Defaulting to 200.')
+            self.CHUNK_SIZE = 200
+
+        # Store output file as string - will be converted to Path when needed
+        self.OUTPUT_FILE = os.getenv('OUTPUT_FILE', 'trace_ai.md')
+
+        # Optional Chroma server for the chromadb reporter (embedded database if empty)
+        self.CHROMA_SERVER_URL = os.getenv('CHROMA_SERVER_URL', '')
+
+        # File Extensions to Analyze, normalized to lowercase with a leading dot
+        self.FILE_EXTENSIONS = frozenset(
+            ext if ext.startswith('.') else '.' + ext
+            for ext in (
+                part.strip().lower()
+                for part in os.getenv(
+                    'FILE_EXTENSIONS', '.cs,.py,.js,.ts,.html,.css'
+                ).split(',')
+            )
+            if ext
+        )
+
+        # Binary and Generated Folders to Exclude (lowercase; matched
+        # case-insensitively)
+        self.EXCLUDED_FOLDERS = frozenset(
+            (
+                'obj',
+                'debug',
+                'release',
+                'properties',
+                'bin',
+                'node_modules',
+                '.git',
+                '__pycache__',
+                'venv',
+                '.venv',
+                'env',
+                '.env',
+                'dist',
+                'build',
+            )
+        )
+
+        # Whether to obey .gitignore files in the processed folder
+        self.OBEY_GITIGNORE = _strtobool(os.getenv('OBEY_GITIGNORE', ''))
+
+    def get_project_root(self) -> Path:
+        """Return the project root directory."""
+        return Path(__file__).parent
+
+    def get_output_path(self, output_file: Optional[str] = None) -> Path:
+        """
+        Return the full path to the output file, handling both Windows and Linux paths.
+
+        Args:
+            output_file: Optional output file path or name. If None, uses self.OUTPUT_FILE.
+
+        Returns:
+            Path object representing the absolute path to the output file.
+        """
+        if output_file is None:
+            output_file = self.OUTPUT_FILE
+
+        output_path = Path(output_file)
+        if output_path.is_absolute():
+            return output_path
+
+        # Treat anything else as relative to the working directory. On
+        # non-Windows platforms, convert Windows-style path separators first
+        if not _IS_WINDOWS and isinstance(output_file, str) and '\\' in output_file:
+            output_path = Path(output_file.replace('\\', '/'))
+
+        return Path.cwd() / output_path
+
+    def reload_from_env(self, force_dotenv: bool = False) -> None:
+        """
+        Re-read the configuration from the environment into this instance.
+
+        Values are updated in place, so every module holding a reference to
+        the ``config`` singleton sees the new settings.
+
+        Args:
+            force_dotenv: Whether to parse the .env file again as well
+        """
+        if force_dotenv:
+            Config._dotenv_loaded = False
+        self._initialize()
+
+    @classmethod
+    def reload(cls, force_dotenv: bool = False):
+        """
+        Reload configuration from environment variables.
+
+        Args:
+            force_dotenv: Whether to parse the .env file again as well
+        """
+        if force_dotenv:
+            cls._dotenv_loaded = False
+        if cls._instance is None:
+            return Config()
+        cls._instance.reload_from_env()
+        return cls._instance
+
+    @property
+    def LLM_HOST(self) -> str:
+        """
+        Returns the host for the currently selected LLM provider.
+        This property exists for backward compatibility.
+
+        Returns:
+            The host address string for the current LLM provider.
+        """
+        # LMStudio is also the fallback for an unknown provider
+        return self.OLLAMA_HOST if self._is_ollama else self.LMSTUDIO_HOST
+
+
+# Create the singleton instance
+config = Config()
+
+# Store a reference to the original instance for tests
+_original_instance = config
+
+
+# Add a function to restore the original instance
+def restore_original_instance():
+    """Restore the original singleton instance."""
+    Config._instance = _original_instance
+    return _original_instance
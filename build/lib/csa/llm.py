@@ -0,0 +1,470 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from csa.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def _call_with_timeout(
+    func: Callable[..., Any], timeout: float, *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Run a blocking call in a daemon thread and wait at most timeout seconds.
+
+    A call that times out is abandoned rather than joined. Each call gets
+    its own daemon thread, so a hung request neither delays later requests
+    nor blocks interpreter exit.
+
+    Args:
+        func: Callable to run
+        timeout: Timeout in seconds
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The return value of func
+
+    Raises:
+        TimeoutError: If func does not finish within timeout seconds
+    """
+    outcome: Dict[str, Any] = {}
+
+    def run() -> None:
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=run, name='csa-llm', daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise TimeoutError(f'LLM request timed out after {timeout} seconds')
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+class LMStudioWebsocketError(Exception):
+    """Exception raised when unable to connect to LM Studio websocket."""
+
+    pass
+
+
+class OllamaError(Exception):
+    """Exception raised when unable to connect to or use Ollama API."""
+
+    pass
+
+
+# Context window sizes for common Ollama model families, longest prefix
+# first so that e.g. 'qwen2.5-coder' is matched before 'qwen'
+_OLLAMA_CONTEXT_LENGTHS: Tuple[Tuple[str, int], ...] = tuple(
+    sorted(
+        {
+            'llama3': 8192,
+            'llama2': 4096,
+            'mistral': 8192,
+            'mixtral': 32768,
+            'qwen': 32768,
+            'phi3': 4096,
+            'gemma': 8192,
+            'qwen2': 32768,
+            'qwen2.5-coder': 32768,
+            'codellama': 16384,
+            'vicuna': 4096,
+            'wizardcoder': 16384,
+        }.items(),
+        key=lambda item: -len(item[0]),
+    )
+)
+
+# Whether the LM Studio websocket loggers have had their level set
+_LMSTUDIO_LOGGERS_CONFIGURED = False
+
+# Ollama clients by host, shared so that every provider for the same host
+# reuses one HTTP connection pool
+_OLLAMA_CLIENTS: Dict[str, Any] = {}
+
+# Response class -> content extractor, resolved on first sight of each class
+_EXTRACTOR_CACHE: Dict[type, Callable[[Any], str]] = {}
+
+
+def extract_response_content(response_obj: Any) -> str:
+    """
+    Extract text content from various LLM response object formats.
+
+    Args:
+        response_obj: Response object from an LLM
+
+    Returns:
+        Extracted text content as string
+    """
+    cls = type(response_obj)
+    extractor = _EXTRACTOR_CACHE.get(cls)
+    if extractor is None:
+        if hasattr(response_obj, 'content'):
+            extractor = attrgetter('content')
+        elif hasattr(response_obj, 'prediction'):
+            extractor = attrgetter('prediction')
+        else:
+            # Convert the object to string if no specific attribute found
+            extractor = str
+        _EXTRACTOR_CACHE[cls] = extractor
+    return extractor(response_obj)
+
+
+def _get_ollama_client(host: str) -> Any:
+    """
+    Return the shared Ollama client for a host, creating it on first use.
+
+    Args:
+        host: Host address of the Ollama server
+
+    Returns:
+        An ollama.Client instance
+    """
+    client = _OLLAMA_CLIENTS.get(host)
+    if client is None:
+        # Import here instead of at the top to make mocking easier for tests
+        from ollama import Client
+
+        client = Client(host=f'{host}', timeout=20.0)
+        _OLLAMA_CLIENTS[host] = client
+    return client
+
+
+class LLMProvider(ABC):
+    """Base class for LLM providers."""
+
+    # Context length of the loaded model, memoized by get_context_length()
+    _cached_context_length: Optional[int] = None
+
+    def invalidate_context_length(self) -> None:
+        """Forget the memoized context length, e.g. after switching models."""
+        self._cached_context_length = None
+
+    @abstractmethod
+    def generate_response(self, prompt: str, timeout: Optional[int] = None) -> str:
+        """
+        Generate a response for the given prompt.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            timeout: Timeout in seconds for the request (None for no timeout)
+
+        Returns:
+            Generated response as string
+        """
+        pass
+
+    @abstractmethod
+    def get_context_length(self) -> int:
+        """
+        Get the context length of the currently loaded model.
+
+        Returns:
+            The context length of the model in tokens
+        """
+        pass
+
+
+class LMStudioProvider(LLMProvider):
+    """LMStudio API client for local LLM inference.
+
+    Uses the LMSTUDIO_HOST configuration value to connect to a local LM Studio instance.
+    """
+
+    def __init__(self, host: str | None = None, reinit_per_request: bool = False):
+        """
+        Initialize the LMStudio provider.
+
+        Args:
+            host: Host address for LMStudio (default: config.LMSTUDIO_HOST)
+            reinit_per_request: Re-acquire the model handle before every
+                request instead of reusing it (default: False)
+        """
+        self.host = host or config.LMSTUDIO_HOST
+        self.reinit_per_request = reinit_per_request
+
+        # Import here instead of at the top to make mocking easier for tests
+        try:
+            import lmstudio as lms
+
+            # Set websocket-related loggers to DEBUG level (once per process)
+            global _LMSTUDIO_LOGGERS_CONFIGURED
+            if not _LMSTUDIO_LOGGERS_CONFIGURED:
+                for logger_name in ['_AsyncWebsocketThread', 'SyncLMStudioWebsocket']:
+                    logging.getLogger(logger_name).setLevel(logging.DEBUG)
+                _LMSTUDIO_LOGGERS_CONFIGURED = True
+
+            self.lms = lms
+
+            # Connect to the model - host is managed through LMStudio's config
+            # We're not passing host directly as the function doesn't accept it
+            self.model = self.lms.llm()
+            logger.info(f'Initialized LMStudio provider with host: {self.host}')
+
+        except ImportError:
+            raise ImportError('Please install lmstudio: pip install lmstudio')
+        except Exception as e:
+            logger.error(f'Error initializing LMStudio: {str(e)}')
+            raise LMStudioWebsocketError(
+                f'Failed to connect to LM Studio at {self.host}: {str(e)}'
+            )
+
+    def generate_response(self, prompt: str, timeout: Optional[int] = None) -> str:
+        """
+        Generate a response for the given prompt.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            timeout: Timeout in seconds for the request (None for no timeout)
+
+        Returns:
+            Generated response as string
+        """
+        try:
+            if self.reinit_per_request or getattr(self, 'model', None) is None:
+                self.model = self.lms.llm()
+
+            try:
+                return self._respond(prompt, timeout)
+            except Exception as e:
+                if not self._is_connection_error(e):
+                    raise
+                # The cached handle went stale; reconnect and retry once
+                logger.warning(
+                    f'LM Studio connection lost ({str(e)}), reconnecting and retrying'
+                )
+                self.model = self.lms.llm()
+                self.invalidate_context_length()
+                return self._respond(prompt, timeout)
+
+        except TimeoutError:
+            # Re-raise timeout errors to be handled by the caller
+            raise
+        except Exception as e:
+            logger.error(f'Error generating response: {str(e)}')
+            raise LMStudioWebsocketError(
+                f'Failed to get response from LM Studio: {str(e)}'
+            ) from e
+
+    def _respond(self, prompt: str, timeout: Optional[int]) -> str:
+        """
+        Send a prompt to the current model handle.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            timeout: Timeout in seconds for the request (None for no timeout)
+
+        Returns:
+            Generated response as string
+        """
+        # Use timeout if provided; raises TimeoutError for caller handling
+        if timeout is not None:
+            response_obj = _call_with_timeout(self.model.respond, timeout, prompt)
+        else:
+            # No timeout specified, use normal call
+            response_obj = self.model.respond(prompt)
+        return extract_response_content(response_obj)
+
+    def _is_connection_error(self, exc: Exception) -> bool:
+        """
+        Check whether an exception signals a dropped LM Studio connection.
+
+        Args:
+            exc: Exception raised while generating a response
+
+        Returns:
+            True if reconnecting may fix the error
+        """
+        # Imported here like the SDK itself, to make mocking easier for tests
+        from lmstudio import LMStudioChannelClosedError
+        from lmstudio import LMStudioWebsocketError as SDKWebsocketError
+
+        return isinstance(
+            exc, (ConnectionError, SDKWebsocketError, LMStudioChannelClosedError)
+        )
+
+    def get_context_length(self) -> int:
+        """
+        Get the context length of the currently loaded model.
+
+        Returns:
+            The context length of the model in tokens
+        """
+        if self._cached_context_length is not None:
+            return self._cached_context_length
+
+        try:
+            # Ensure model is initialized
+            if not hasattr(self, 'model') or self.model is None:
+                self.model = self.lms.llm()
+
+            # Get context length from the model
+            context_length = self.model.get_context_length()
+            self._cached_context_length = context_length
+            return context_length
+        except Exception as e:
+            logger.warning(f'Failed to get context length from LM Studio: {str(e)}')
+            # Return a conservative default
+            return 8192
+
+
+class OllamaProvider(LLMProvider):
+    """Ollama API client for local LLM inference."""
+
+    def __init__(self, host: str | None = None, model: str | None = None):
+        """
+        Initialize the Ollama provider.
+
+        Args:
+            host: Host address for Ollama (default: config.OLLAMA_HOST)
+            model: Model name to use (default: config.OLLAMA_MODEL)
+        """
+        self.host = host or config.OLLAMA_HOST
+        self.model_name = model or config.OLLAMA_MODEL
+        # Model names reported by the server at startup (empty if unknown)
+        self._available_models: frozenset = frozenset()
+
+        try:
+            # Initialize (or reuse) the Ollama client for this host
+            self.client = _get_ollama_client(self.host)
+            logger.info(
+                f'Initialized Ollama provider with host: {self.host}, model: {self.model_name}'
+            )
+
+            # Check if model exists; older clients report the model name
+            # under 'name', newer ones under 'model'
+            try:
+                models = self.client.list()
+                self._available_models = frozenset(
+                    model.get('model') or model.get('name')
+                    for model in models.get('models', [])
+                )
+                if self.model_name not in self._available_models:
+                    logger.warning(
+                        f"Model {self.model_name} not found in Ollama. Please make sure it's available."
+                    )
+            except Exception as e:
+                logger.warning(f'Could not verify model availability: {str(e)}')
+
+        except ImportError:
+            raise ImportError('Please install ollama: pip install ollama')
+        except Exception as e:
+            logger.error(f'Error initializing Ollama: {str(e)}')
+            raise OllamaError(f'Failed to connect to Ollama at {self.host}: {str(e)}')
+
+    def generate_response(self, prompt: str, timeout: Optional[int] = None) -> str:
+        """
+        Generate a response for the given prompt.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            timeout: Timeout in seconds for the request (None for no timeout)
+
+        Returns:
+            Generated response as string
+        """
+        try:
+            # Use timeout if provided; raises TimeoutError for caller handling
+            if timeout is not None:
+                response = _call_with_timeout(
+                    self.client.generate, timeout, model=self.model_name, prompt=prompt
+                )
+                return response.get('response', '')
+            else:
+                # No timeout specified, use normal call
+                response = self.client.generate(model=self.model_name, prompt=prompt)
+                return response.get('response', '')
+        except TimeoutError:
+            # Re-raise timeout errors to be handled by the caller
+            raise
+        except Exception as e:
+            logger.error(f'Error generating response: {str(e)}')
+            raise OllamaError(f'Failed to get response from Ollama: {str(e)}')
+
+    def get_context_length(self) -> int:
+        """
+        Get the context length of the currently loaded model.
+
+        Returns:
+            The context length of the model in tokens
+        """
+        if self._cached_context_length is not None:
+            return self._cached_context_length
+
+        try:
+            # Ensure model is initialized
+            if not hasattr(self, 'client') or self.client is None:
+                self.client = _get_ollama_client(self.host)
+
+            # Try to get direct context length from model info
+            model_info = self.client.show(self.model_name)
+            if hasattr(model_info, 'modelinfo'):
+                # Check for context length in model info
+                for key in [
+                    'context_length',
+                    'qwen2.context_length',
+                    'llama.context_length',
+                    'mistral.context_length',
+                ]:
+                    if key in model_info.modelinfo:
+                        context_length = int(model_info.modelinfo[key])
+                        logger.info(
+                            f'Context length for {self.model_name}: {context_length} tokens'
+                        )
+                        self._cached_context_length = context_length
+                        return context_length
+
+            # Fall back to model family-based estimation
+            model_base = (
+                self.model_name.partition(':')[0].lower() if self.model_name else 'unknown'
+            )
+
+            # Check if we have a known context length for this model
+            for model_prefix, length in _OLLAMA_CONTEXT_LENGTHS:
+                if model_base.startswith(model_prefix):
+                    logger.info(
+                        f'Using estimated context length for {self.model_name}: {length} tokens'
+                    )
+                    self._cached_context_length = length
+                    return length
+
+            # Return a conservative default if we don't recognize the model
+            logger.warning(
+                f'Unknown model: {self.model_name}, using default context length of 8192 tokens'
+            )
+            self._cached_context_length = 8192
+            return 8192
+        except Exception as e:
+            logger.warning(f'Failed to get context length from Ollama: {str(e)}')
+            # Return a conservative default
+            return 8192
+
+
+def get_llm_provider() -> LLMProvider:
+    """Factory function to get the configured LLM provider."""
+    provider = config.LLM_PROVIDER.lower()
+
+    if provider == 'lmstudio':
+        return LMStudioProvider()
+    elif provider == 'ollama':
+        return OllamaProvider()
+    else:
+        raise ValueError(f'Unsupported LLM provider: {provider}')
+
+
+# Explicitly export the utility functions for importing by other modules
+__all__ = [
+    'extract_response_content',
+    'LLMProvider',
+    'LMStudioProvider',
+    'OllamaProvider',
+    'get_llm_provider',
+]
@@ -0,0 +1,28 @@
+"""Reporters module for code analysis output."""
+
+import importlib
+from typing import Any
+
+from csa.reporters.reporters import BaseAnalysisReporter
+
+__all__ = [
+    'BaseAnalysisReporter',
+    'MarkdownAnalysisReporter',
+    'ChromaDBAnalysisReporter',
+]
+
+# Concrete reporters are imported on first access, so using the markdown
+# reporter does not pull in chromadb and its dependencies
+_LAZY_EXPORTS = {
+    'MarkdownAnalysisReporter': 'csa.reporters.markdown',
+    'ChromaDBAnalysisReporter': 'csa.reporters.chromadb',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
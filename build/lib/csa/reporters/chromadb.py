@@ -0,0 +1,876 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit
+
+import chromadb
+from chromadb.config import Settings
+from chromadb.utils import embedding_functions
+
+from csa.reporters.reporters import BaseAnalysisReporter
+
+logger = logging.getLogger(__name__)
+
+# Sentence-transformers model used for embeddings and its vector size
+_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+_EMBEDDING_DIMENSION = 384
+
+# Embeddings in the plain-list form accepted by Collection.upsert
+_Embeddings = List[Union[Sequence[float], Sequence[int]]]
+
+# HNSW index parameters for the searchable collections: denser graph and
+# wider candidate lists than Chroma's defaults (M=16, construction_ef=100)
+# for better recall. Only applied when a collection is first created.
+_HNSW_METADATA = {
+    "hnsw:M": 24,
+    "hnsw:construction_ef": 128,
+    "hnsw:search_ef": 100,
+}
+
+# Characters replaced by underscores in ChromaDB record ids
+_SAFE_ID_TABLE = str.maketrans({"/": "_", "\\": "_", ".": "_", " ": "_"})
+
+
+class _FileContext(NamedTuple):
+    """Per-file values shared by every record stored for that file."""
+
+    file_path: str
+    rel_path: str
+    filename: str
+    extension: str
+    safe_id: str
+
+
+def _content_id(prefix: str, text: str) -> str:
+    """
+    Build a record id from a prefix and a hash of the record's content.
+
+    Args:
+        prefix: Id prefix identifying the file and item type
+        text: Record content
+
+    Returns:
+        Id that stays the same as long as the content does
+    """
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+    return f"{prefix}_{digest}"
+
+
+def _class_name(class_info: str) -> str:
+    """Extract the class name from a class description like 'Name: ...'."""
+    name, sep, _ = class_info.partition(":")
+    return name.strip() if sep else class_info
+
+
+def _function_name(function_info: str) -> str:
+    """Extract the function name from a signature like 'name(args)'."""
+    name, sep, _ = function_info.partition("(")
+    return name.strip() if sep else function_info
+
+
+def _module_name(dependency_info: str) -> str:
+    """Extract the module name from a dependency like 'import module'."""
+    _, sep, rest = dependency_info.partition(" ")
+    return rest.partition(" ")[0] if sep else dependency_info
+
+
+def _placeholder_embeddings(count: int) -> _Embeddings:
+    """
+    Return zero vectors for records that are never searched by similarity.
+
+    Args:
+        count: Number of records
+
+    Returns:
+        One zero vector of the embedding model's size per record
+    """
+    return [[0.0] * _EMBEDDING_DIMENSION for _ in range(count)]
+
+
+def _select_embedding_device() -> str:
+    """
+    Pick the torch device for the sentence-transformers model.
+
+    Returns:
+        "cuda" or "mps" if available, otherwise "cpu"
+    """
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
+
+class ChromaDBAnalysisReporter(BaseAnalysisReporter):
+    """
+    Reporter that stores analysis results in a ChromaDB vector database.
+
+    This class provides methods to search and retrieve code analysis data stored in a ChromaDB vector database,
+    with separate collections for different aspects of the code (summaries, classes,
+    functions, dependencies). Each entry is stored with appropriate metadata and
+    embeddings for semantic search.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "data/chroma",
+        batch_size: int = 200,
+        server_url: Optional[str] = None,
+        tune_sqlite: bool = True,
+    ):
+        """
+        Initialize the ChromaDB reporter.
+
+        Args:
+            output_dir: Directory path where the ChromaDB data will be stored
+            batch_size: Number of pending records per collection that triggers an upsert
+            server_url: URL of a running Chroma server (e.g. http://localhost:8000)
+                to store the data in instead of an embedded database in output_dir
+            tune_sqlite: Switch the embedded database's SQLite file to WAL journaling
+        """
+        # Normalize path to handle Windows backslashes properly
+        self.output_dir = os.path.normpath(output_dir)
+        self.server_url = server_url
+        self.tune_sqlite = tune_sqlite
+        self.client: Optional[chromadb.api.ClientAPI] = None
+        self.collections: dict[str, chromadb.api.models.Collection] = {}
+        self.embedding_function: Any = None
+        self.source_dir = ""
+        # Records waiting to be upserted, per collection and keyed by id so a
+        # later record replaces an earlier one with the same id (as upsert does)
+        self._buffers: Dict[str, Dict[str, Tuple[str, Dict[str, Any]]]] = {}
+        self._batch_size = batch_size
+        # Full batches are written by a single background worker so that
+        # embedding and SQLite writes overlap with the analysis of later files
+        self._flush_pool: Optional[ThreadPoolExecutor] = None
+        self._pending_flushes: List[Future] = []
+        logger.info(f"ChromaDB reporter initialized with output_dir: {self.output_dir}")
+
+    def initialize(self, files: List[str], source_dir: str) -> None:
+        """
+        Initialize the ChromaDB client and collections.
+
+        Args:
+            files: List of file paths to be analyzed
+            source_dir: Source directory path
+        """
+        self.source_dir = source_dir
+        logger.info(f"Initializing ChromaDB with source_dir: {source_dir}")
+
+        # Create output directory if it doesn't exist
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            logger.info(f"Created output directory: {self.output_dir}")
+        except Exception as e:
+            logger.error(f"Error creating output directory {self.output_dir}: {str(e)}")
+            raise
+
+        # Initialize ChromaDB client, either for a server or with persistent storage
+        try:
+            if self.server_url:
+                logger.info(f"Creating ChromaDB HttpClient for server: {self.server_url}")
+                self.client = self._create_http_client(self.server_url)
+                logger.info("ChromaDB HttpClient created successfully")
+            else:
+                logger.info(f"Creating ChromaDB PersistentClient at path: {self.output_dir}")
+                self.client = chromadb.PersistentClient(
+                    path=self.output_dir,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+                logger.info(f"ChromaDB PersistentClient created successfully")
+                if self.tune_sqlite:
+                    self._enable_sqlite_wal()
+
+            # Use sentence-transformers for embeddings, on a GPU when available
+            device = _select_embedding_device()
+            logger.info(f"Loading embedding function on device: {device}")
+            self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
+                model_name=_EMBEDDING_MODEL,
+                device=device
+            )
+            logger.info("Embedding function loaded successfully")
+
+            # Define collections to create
+            collections_config = [
+                ("file_summaries", "Overall file summaries and metadata"),
+                ("classes", "Class definitions and their documentation"),
+                ("functions", "Function and method definitions"),
+                ("dependencies", "Import relationships between files")
+            ]
+
+            logger.info(f"Creating {len(collections_config)} collections")
+
+            # Track success in creating collections
+            collection_success = True
+
+            for name, description in collections_config:
+                try:
+                    logger.info(f"Creating collection: {name}")
+                    collection = self.client.get_or_create_collection(
+                        name=name,
+                        embedding_function=self.embedding_function,
+                        metadata={"description": description, **_HNSW_METADATA}
+                    )
+                    self.collections[name] = collection
+                    logger.info(f"Successfully created collection: {name}")
+                except Exception as e:
+                    collection_success = False
+                    logger.error(f"Error creating collection {name}: {str(e)}")
+
+            if not collection_success:
+                logger.error("Failed to create all collections")
+
+            # Verify collections were created
+            if "file_summaries" not in self.collections:
+                logger.error("Critical: file_summaries collection not created")
+
+            # List all collections to verify they were created
+            all_collections = self.client.list_collections()
+            logger.info(f"Available collections: {all_collections}")  # In v0.6.0+, these are already strings
+
+            # Store basic project metadata
+            try:
+                logger.info("Creating metadata collection")
+                # The metadata collection is only read by id, never searched,
+                # so its records get placeholder vectors instead of embeddings
+                metadata_collection = self.client.get_or_create_collection(
+                    name="metadata",
+                    embedding_function=None
+                )
+
+                # Add project metadata
+                logger.info("Adding project metadata")
+                metadata_collection.upsert(
+                    ids=["project_info"],
+                    embeddings=_placeholder_embeddings(1),
+                    documents=[f"Project analysis for {source_dir}"],
+                    metadatas=[{
+                        "source_dir": source_dir,
+                        "file_count": len(files),
+                        "analysis_date": str(datetime.now())
+                    }]
+                )
+
+                # Store list of files for reference
+                file_chunks: List[List[str]] = []
+                file_ids = []
+                file_metadatas = []
+
+                # Split files into chunks of 50 to avoid token limits
+                for i, file_path in enumerate(files):
+                    chunk_id = i // 50
+                    if len(file_chunks) <= chunk_id:
+                        file_chunks.append([])
+                    file_chunks[chunk_id].append(file_path)
+
+                # Store each chunk
+                documents = []
+                for i, chunk in enumerate(file_chunks):
+                    file_ids.append(f"files_chunk_{i}")
+                    documents.append("\n".join(chunk))
+                    file_metadatas.append({
+                        "type": "file_list",
+                        "chunk": i,
+                        "count": len(chunk)
+                    })
+
+                metadata_collection.upsert(
+                    ids=file_ids,
+                    embeddings=_placeholder_embeddings(len(file_ids)),
+                    documents=documents,
+                    metadatas=file_metadatas
+                )
+
+                self.collections["metadata"] = metadata_collection
+                logger.info("Metadata collection created and populated successfully")
+            except Exception as e:
+                logger.error(f"Error storing project metadata: {str(e)}")
+
+        except Exception as e:
+            logger.error(f"Error initializing ChromaDB: {str(e)}")
+            raise
+
+    def _enable_sqlite_wal(self) -> None:
+        """
+        Switch the embedded database to SQLite's write-ahead log.
+
+        The journal mode is stored in the database file, so Chroma's own
+        connections use it too; WAL avoids rewriting a rollback journal on
+        every committed write.
+        """
+        db_file = os.path.join(self.output_dir, "chroma.sqlite3")
+        try:
+            connection = sqlite3.connect(db_file, timeout=10)
+            try:
+                mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            finally:
+                connection.close()
+            logger.info(f"ChromaDB SQLite journal mode: {mode}")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not enable WAL mode for {db_file}: {str(e)}")
+
+    @property
+    def source_dir(self) -> str:
+        """Source directory of the analyzed project."""
+        return self._source_dir
+
+    @source_dir.setter
+    def source_dir(self, value: str) -> None:
+        self._source_dir = value
+        # Normalized prefix (ending in a separator) of absolute paths below
+        # an absolute source directory, used by _get_relative_path
+        self._source_prefix: Optional[str] = (
+            os.path.normcase(os.path.join(os.path.normpath(value), ""))
+            if os.path.isabs(value)
+            else None
+        )
+
+    @staticmethod
+    def _create_http_client(server_url: str) -> chromadb.api.ClientAPI:
+        """
+        Create a client for a Chroma server.
+
+        Args:
+            server_url: Server URL such as http://localhost:8000
+
+        Returns:
+            ChromaDB HttpClient connected to the server
+        """
+        parts = urlsplit(server_url if "://" in server_url else f"http://{server_url}")
+        ssl = parts.scheme == "https"
+        return chromadb.HttpClient(
+            host=parts.hostname or "localhost",
+            port=parts.port or (443 if ssl else 8000),
+            ssl=ssl,
+            settings=Settings(anonymized_telemetry=False)
+        )
+
+    def update_file_analysis(
+        self, file_analysis: Dict[str, Any], source_dir: str, remaining_files: List[str]
+    ) -> None:
+        """
+        Update the ChromaDB database with analysis results for a file.
+
+        Args:
+            file_analysis: Analysis results for a file
+            source_dir: Source directory path
+            remaining_files: List of files remaining to analyze
+        """
+        if self.client is None:
+            logger.error("ChromaDB client not initialized, cannot update file analysis")
+            return
+
+        file_path = file_analysis.get('file_path', '')
+        if not file_path:
+            logger.error("File path missing in analysis results")
+            return
+
+        # Verify collections exist before proceeding
+        if not self.collections:
+            logger.error("No collections available for storing analysis results")
+            try:
+                logger.info("Attempting to reconnect to existing collections...")
+                for collection_name in ["file_summaries", "classes", "functions", "dependencies", "metadata"]:
+                    try:
+                        self.collections[collection_name] = self.client.get_collection(
+                            name=collection_name,
+                            embedding_function=self.embedding_function
+                        )
+                        logger.info(f"Successfully reconnected to collection: {collection_name}")
+                    except Exception as e:
+                        logger.error(f"Failed to reconnect to collection {collection_name}: {str(e)}")
+            except Exception as e:
+                logger.error(f"Failed to reconnect to collections: {str(e)}")
+                return
+
+        ctx = self._file_context(file_path)
+
+        # Handle error case
+        if 'error' in file_analysis:
+            logger.warning(f"Error in file analysis for {file_path}: {file_analysis['error']}")
+            # Store error information
+            try:
+                if "file_summaries" in self.collections:
+                    self._add_to_buffer(
+                        "file_summaries",
+                        ids=[ctx.safe_id],
+                        documents=[f"Error analyzing file: {file_analysis['error']}"],
+                        metadatas=[{
+                            "file_path": file_path,
+                            "has_error": True,
+                            "error_message": file_analysis.get('error', ''),
+                        }]
+                    )
+            except Exception as e:
+                logger.error(f"Error storing file error information: {str(e)}")
+            return
+
+        # Process file summary
+        self._store_file_summary(file_analysis, ctx)
+
+        # Process classes, functions, and dependencies
+        analyses = file_analysis.get('analyses', [])
+        if analyses:
+            # Gather all unique items from analyses, in first-seen order so
+            # that records are written in the order they appear in the file
+            classes = dict.fromkeys(
+                cls for analysis in analyses for cls in analysis.get('classes') or ()
+            )
+            functions = dict.fromkeys(
+                func for analysis in analyses for func in analysis.get('functions') or ()
+            )
+            dependencies = dict.fromkeys(
+                dep for analysis in analyses for dep in analysis.get('dependencies') or ()
+            )
+
+            # Store classes
+            self._store_classes(ctx, classes)
+
+            # Store functions
+            self._store_functions(ctx, functions)
+
+            # Store dependencies
+            self._store_dependencies(ctx, dependencies)
+
+    def finalize(self) -> None:
+        """
+        Finalize the ChromaDB database.
+        """
+        if self.client is None:
+            logger.warning("ChromaDB client not initialized, nothing to finalize")
+            return
+
+        # Write out records still waiting in the batch buffers
+        self._wait_for_pending_flushes()
+        self._flush_all()
+        if self._flush_pool is not None:
+            self._flush_pool.shutdown()
+            self._flush_pool = None
+
+        # Update metadata with completion status
+        try:
+            if "metadata" in self.collections:
+                self.collections["metadata"].update(
+                    ids=["project_info"],
+                    metadatas=[{
+                        "completed": True,
+                        "completion_date": str(datetime.now())
+                    }]
+                )
+
+                logger.info(f"ChromaDB analysis data stored in {self.output_dir}")
+
+                # Generate statistics for collections
+                stats = {}
+                for name, collection in self.collections.items():
+                    count = collection.count()
+                    stats[name] = count
+
+                logger.info(f"ChromaDB collection statistics: {stats}")
+        except Exception as e:
+            logger.error(f"Error finalizing ChromaDB: {str(e)}")
+
+    def _add_to_buffer(
+        self,
+        name: str,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Queue records for a collection and flush it once the batch is full.
+
+        Args:
+            name: Collection name
+            ids: Record IDs
+            documents: Record documents
+            metadatas: Record metadata
+        """
+        buffer = self._buffers.setdefault(name, {})
+        for record_id, document, metadata in zip(ids, documents, metadatas, strict=True):
+            buffer[record_id] = (document, metadata)
+        if len(buffer) >= self._batch_size:
+            self._flush_in_background(name)
+
+    def _flush_in_background(self, name: str) -> None:
+        """
+        Hand the queued records of a collection to the background writer.
+
+        Args:
+            name: Collection name
+        """
+        buffer = self._buffers.pop(name, None)
+        if not buffer:
+            return
+
+        if self._flush_pool is None:
+            self._flush_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="chromadb-flush"
+            )
+        self._pending_flushes = [f for f in self._pending_flushes if not f.done()]
+        self._pending_flushes.append(
+            self._flush_pool.submit(self._write_records, name, buffer)
+        )
+
+    def _wait_for_pending_flushes(self) -> None:
+        """Block until every background flush has been written."""
+        for future in self._pending_flushes:
+            future.result()
+        self._pending_flushes = []
+
+    def _write_records(
+        self,
+        name: str,
+        buffer: Dict[str, Tuple[str, Dict[str, Any]]],
+        embeddings: Optional[List[Any]] = None,
+    ) -> None:
+        """
+        Upsert a batch of records into a collection.
+
+        Args:
+            name: Collection name
+            buffer: Records keyed by id, as (document, metadata) pairs
+            embeddings: Precomputed embeddings in buffer order; computed here
+                if not given
+        """
+        try:
+            if embeddings is None:
+                embeddings = self._embed([document for document, _ in buffer.values()])
+        except Exception as e:
+            logger.error(f"Error computing embeddings for collection {name}: {str(e)}")
+
+        ids = list(buffer)
+        documents = [document for document, _ in buffer.values()]
+        metadatas = [metadata for _, metadata in buffer.values()]
+        try:
+            self.collections[name].upsert(
+                ids=ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=metadatas
+            )
+            logger.info("Stored %d records in collection %s", len(ids), name)
+        except Exception as e:
+            logger.error(f"Error storing {len(ids)} records in collection {name}: {str(e)}")
+
+    def _flush_all(self) -> None:
+        """Upsert the queued records of every collection."""
+        pending = [(name, buffer) for name, buffer in self._buffers.items() if buffer]
+        self._buffers = {}
+
+        # Embed the documents of all collections in one pass and give each
+        # collection its slice; on failure every collection embeds its own
+        documents = [document for _, buffer in pending for document, _ in buffer.values()]
+        try:
+            embeddings = self._embed(documents)
+        except Exception as e:
+            logger.error(f"Error computing embeddings for {len(documents)} records: {str(e)}")
+            embeddings = None
+
+        start = 0
+        for name, buffer in pending:
+            end = start + len(buffer)
+            self._write_records(
+                name, buffer, embeddings[start:end] if embeddings is not None else None
+            )
+            start = end
+
+    def _new_file_records(
+        self, name: str, ctx: _FileContext, records: Dict[str, str]
+    ) -> Dict[str, str]:
+        """
+        Replace a file's stored records in a collection with its current ones.
+
+        Stored records of the file whose id is not among the current ids are
+        deleted. Since ids are derived from the content, records that are
+        already stored are unchanged and need not be embedded again.
+
+        Args:
+            name: Collection name
+            ctx: Per-file values of the analyzed file
+            records: Current documents of the file, keyed by content id
+
+        Returns:
+            The records that are not stored yet
+        """
+        collection = self.collections[name]
+        try:
+            stored = set(
+                collection.get(where={"file_path": ctx.file_path}, include=[])["ids"]
+            )
+            stale = stored.difference(records)
+            if stale:
+                collection.delete(ids=list(stale))
+                logger.debug("Deleted %d outdated records from collection %s", len(stale), name)
+        except Exception as e:
+            logger.warning(f"Could not check stored records in collection {name}: {str(e)}")
+            return records
+        return {key: value for key, value in records.items() if key not in stored}
+
+    def _embed(self, documents: List[str]) -> Optional[List[Any]]:
+        """
+        Compute embeddings for documents with the reporter's embedding function.
+
+        Args:
+            documents: Documents to embed
+
+        Returns:
+            One embedding per document, or None if no embedding function is set
+        """
+        if self.embedding_function is None or not documents:
+            return None
+        return list(self.embedding_function(documents))
+
+    def _file_context(self, file_path: str) -> _FileContext:
+        """
+        Compute the per-file values shared by all records of a file.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            The file's context
+        """
+        # Interned so every record of the file, across all collections and
+        # repeated analyses, references a single copy of each string
+        return _FileContext(
+            file_path=sys.intern(file_path),
+            rel_path=sys.intern(self._get_relative_path(file_path)),
+            filename=sys.intern(os.path.basename(file_path)),
+            extension=os.path.splitext(file_path)[1],
+            safe_id=self._get_safe_id(file_path),
+        )
+
+    def _get_safe_id(self, file_path: str) -> str:
+        """
+        Create a safe ID from a file path.
+
+        Args:
+            file_path: File path to transform
+
+        Returns:
+            Safe ID string for ChromaDB
+        """
+        # Replace path separators, dots and spaces with underscores in one pass
+        return file_path.translate(_SAFE_ID_TABLE)
+
+    def _store_file_summary(self, file_analysis: Dict[str, Any], ctx: _FileContext) -> None:
+        """
+        Store file summary in the database.
+
+        Args:
+            file_analysis: Analysis results for a file
+            ctx: Per-file values of the analyzed file
+        """
+        try:
+            summary = file_analysis.get('summary', 'No summary available.')
+
+            # Get file metadata
+            total_lines = file_analysis.get('total_lines', 0)
+
+            # Check if collection exists before attempting to use it
+            if "file_summaries" not in self.collections:
+                logger.error(f"Cannot store file summary: file_summaries collection not available")
+                return
+
+            # Store in summary collection
+            self._add_to_buffer(
+                "file_summaries",
+                ids=[ctx.safe_id],
+                documents=[summary],
+                metadatas=[{
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "extension": ctx.extension,
+                    "total_lines": total_lines,
+                    "has_error": file_analysis.get('has_errors', False),
+                    "oversized_file": file_analysis.get('oversized_file', False),
+                }]
+            )
+            logger.info("Queued summary for %s", ctx.filename)
+
+        except Exception as e:
+            logger.error(f"Error storing file summary for {ctx.file_path}: {str(e)}")
+
+    def _store_classes(self, ctx: _FileContext, classes: Collection[str]) -> None:
+        """
+        Store class information in the database.
+
+        Args:
+            ctx: Per-file values of the analyzed file
+            classes: Unique class names and information, in order
+        """
+        # Check if collection exists before attempting to use it
+        if "classes" not in self.collections:
+            if classes:
+                logger.error(f"Cannot store classes: classes collection not available")
+            return
+
+        try:
+            # Runs even without classes, so that removed ones are deleted
+            records = self._new_file_records(
+                "classes",
+                ctx,
+                {_content_id(f"{ctx.safe_id}_class", info): info for info in classes},
+            )
+            if not records:
+                return
+
+            metadatas = [
+                {
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "class_name": _class_name(class_info),
+                    "type": "class"
+                }
+                for class_info in records.values()
+            ]
+
+            self._add_to_buffer(
+                "classes",
+                ids=list(records),
+                documents=list(records.values()),
+                metadatas=metadatas
+            )
+            logger.info("Queued %d classes for %s", len(records), ctx.filename)
+
+        except Exception as e:
+            logger.error(f"Error storing classes for {ctx.file_path}: {str(e)}")
+
+    def _store_functions(self, ctx: _FileContext, functions: Collection[str]) -> None:
+        """
+        Store function information in the database.
+
+        Args:
+            ctx: Per-file values of the analyzed file
+            functions: Unique function names and information, in order
+        """
+        # Check if collection exists before attempting to use it
+        if "functions" not in self.collections:
+            if functions:
+                logger.error(f"Cannot store functions: functions collection not available")
+            return
+
+        try:
+            # Runs even without functions, so that removed ones are deleted
+            records = self._new_file_records(
+                "functions",
+                ctx,
+                {_content_id(f"{ctx.safe_id}_function", info): info for info in functions},
+            )
+            if not records:
+                return
+
+            metadatas = [
+                {
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "function_name": _function_name(function_info),
+                    "type": "function"
+                }
+                for function_info in records.values()
+            ]
+
+            self._add_to_buffer(
+                "functions",
+                ids=list(records),
+                documents=list(records.values()),
+                metadatas=metadatas
+            )
+            logger.info("Queued %d functions for %s", len(records), ctx.filename)
+
+        except Exception as e:
+            logger.error(f"Error storing functions for {ctx.file_path}: {str(e)}")
+
+    def _store_dependencies(self, ctx: _FileContext, dependencies: Collection[str]) -> None:
+        """
+        Store dependency information in the database.
+
+        Args:
+            ctx: Per-file values of the analyzed file
+            dependencies: Unique dependency information, in order
+        """
+        # Check if collection exists before attempting to use it
+        if "dependencies" not in self.collections:
+            if dependencies:
+                logger.error(f"Cannot store dependencies: dependencies collection not available")
+            return
+
+        try:
+            # Runs even without dependencies, so that removed ones are deleted
+            records = self._new_file_records(
+                "dependencies",
+                ctx,
+                {_content_id(f"{ctx.safe_id}_dependency", info): info for info in dependencies},
+            )
+            if not records:
+                return
+
+            metadatas = [
+                {
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "module_name": _module_name(dependency_info),
+                    "type": "dependency"
+                }
+                for dependency_info in records.values()
+            ]
+
+            self._add_to_buffer(
+                "dependencies",
+                ids=list(records),
+                documents=list(records.values()),
+                metadatas=metadatas
+            )
+            logger.info("Queued %d dependencies for %s", len(records), ctx.filename)
+
+        except Exception as e:
+            logger.error(f"Error storing dependencies for {ctx.file_path}: {str(e)}")
+
+    def _get_relative_path(self, file_path: str) -> str:
+        """
+        Get path relative to source directory.
+
+        Args:
+            file_path: Absolute file path
+
+        Returns:
+            Relative path
+        """
+        # For absolute paths, try to make them relative to source_dir
+        if self._source_prefix is not None and os.path.isabs(file_path):
+            # Test and slice the same normalized string, so that "..", "./"
+            # or doubled separators cannot shift the slice
+            file_path = os.path.normpath(file_path)
+            if os.path.normcase(file_path).startswith(self._source_prefix):
+                return file_path[len(self._source_prefix):]
+            # If not a subpath, just use the filename
+            return os.path.basename(file_path)
+
+        # For relative paths, use as is
+        return file_path
\ No newline at end of file
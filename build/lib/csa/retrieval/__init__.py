@@ -0,0 +1,5 @@
+"""Retrieval module for code analysis results."""
+
+from csa.retrieval.chromadb_retriever import ChromaDBAnalysisRetriever
+
+__all__ = ['ChromaDBAnalysisRetriever']
\ No newline at end of file
@@ -12,11 +12,7 @@ from tqdm import tqdm
 from csa.code_analyzer import CodeAnalyzer, get_code_analyzer
 from csa.config import config
 from csa.llm import LLMProvider
-from csa.reporters import (
-    BaseAnalysisReporter,
-    ChromaDBAnalysisReporter,
-    MarkdownAnalysisReporter,
-)
+from csa.reporters import BaseAnalysisReporter, MarkdownAnalysisReporter
 
 logger = logging.getLogger(__name__)
 
@@ -77,11 +73,7 @@ def discover_files(
         walker = [next(os.walk(source_path))]
     for root, dirs, filenames in walker:
         # Skip excluded directories
-        dirs[:] = [
-            d
-            for d in dirs
-            if d.lower() not in [f.lower() for f in config.EXCLUDED_FOLDERS]
-        ]
+        dirs[:] = [d for d in dirs if d.lower() not in config.EXCLUDED_FOLDERS]
 
         for filename in filenames:
             file_path = Path(root) / filename
@@ -95,9 +87,9 @@ def discover_files(
                 rel_path = filename
 
             # Skip files with unwanted extensions unless include_patterns specified
-            if not include_patterns and not any(
-                file_path.suffix.lower() == ext.lower()
-                for ext in config.FILE_EXTENSIONS
+            if (
+                not include_patterns
+                and file_path.suffix.lower() not in config.FILE_EXTENSIONS
             ):
                 continue
 
@@ -522,8 +514,18 @@ def collect_files(
     """Discover or resume file list and return initialized reporter and files."""
     # Prepare reporter based on type
     if reporter_type.lower() == 'chromadb':
-        reporter: BaseAnalysisReporter = ChromaDBAnalysisReporter(output_path)
-        logger.info(f'Using ChromaDB reporter with database at {output_path}')
+        # Imported here so markdown-only runs never load chromadb
+        from csa.reporters.chromadb import ChromaDBAnalysisReporter
+
+        reporter: BaseAnalysisReporter = ChromaDBAnalysisReporter(
+            output_path, server_url=config.CHROMA_SERVER_URL or None
+        )
+        if config.CHROMA_SERVER_URL:
+            logger.info(
+                f'Using ChromaDB reporter with server at {config.CHROMA_SERVER_URL}'
+            )
+        else:
+            logger.info(f'Using ChromaDB reporter with database at {output_path}')
     else:
         # If the provided output_path is a directory, create default markdown filename inside it
         if os.path.isdir(output_path) or output_path.endswith(os.sep):
@@ -704,61 +706,63 @@ def analyze_codebase(
         None  # Track the current directory to show separator only when changing
     )
 
-    # Process files in alphabetical order
-    for file_path in files:
-        # Check for cancellation
-        if cancel_callback():
-            logger.info('Analysis cancelled by user, stopping gracefully')
-            break
+    # Finalize the progress bar and reporter even if the loop is interrupted,
+    # so records the reporter still holds in memory are written out
+    try:
+        # Process files in alphabetical order
+        for file_path in files:
+            # Check for cancellation
+            if cancel_callback():
+                logger.info('Analysis cancelled by user, stopping gracefully')
+                break
 
-        try:
-            # Get directory path to check if we've changed directories
-            file_directory = os.path.dirname(file_path)
-            file_basename = os.path.basename(file_path)
-
-            # If directory changed, print separator and full directory path
-            if file_directory != current_directory:
-                tqdm.write(f"\n{'='*79}")
-                tqdm.write(f'Directory: {file_directory}')
-                tqdm.write(f"\n{'='*79}")
-                current_directory = file_directory
-
-            # Log with just the filename rather than the full path
-            logger.info(f'File {len(analyzed_files)+1}/{len(files)}: {file_basename}')
-
-            # Display only filename for the individual file analysis
-
-            # Process the file via helper
-            continue_run = process_file(
-                file_path=file_path,
-                remaining_files=remaining_files,
-                analyzed_files=analyzed_files,
-                code_analyzer=code_analyzer,
-                reporter=reporter,
-                source_dir=source_dir,
-                chunk_size=chunk_size,
-                cancel_callback=cancel_callback,
-            )
+            try:
+                # Get directory path to check if we've changed directories
+                file_directory = os.path.dirname(file_path)
+                file_basename = os.path.basename(file_path)
+
+                # If directory changed, print separator and full directory path
+                if file_directory != current_directory:
+                    tqdm.write(f"\n{'='*79}")
+                    tqdm.write(f'Directory: {file_directory}')
+                    tqdm.write(f"\n{'='*79}")
+                    current_directory = file_directory
+
+                # Log with just the filename rather than the full path
+                logger.info(f'File {len(analyzed_files)+1}/{len(files)}: {file_basename}')
+
+                # Display only filename for the individual file analysis
+
+                # Process the file via helper
+                continue_run = process_file(
+                    file_path=file_path,
+                    remaining_files=remaining_files,
+                    analyzed_files=analyzed_files,
+                    code_analyzer=code_analyzer,
+                    reporter=reporter,
+                    source_dir=source_dir,
+                    chunk_size=chunk_size,
+                    cancel_callback=cancel_callback,
+                )
 
-            # Update global progress bar
-            file_progress.update(1)
+                # Update global progress bar
+                file_progress.update(1)
 
-            if not continue_run:
-                break
+                if not continue_run:
+                    break
 
-        except InterruptedError:
-            # Handle interruption (cancellation)
-            logger.info(f'Analysis of {file_path} was cancelled')
-            break
-        except Exception as e:
-            logger.error(f'Error analyzing file {file_path}: {str(e)}')
-            # Check if we should continue on error or if cancellation was requested
-            if cancel_callback():
+            except InterruptedError:
+                # Handle interruption (cancellation)
+                logger.info(f'Analysis of {file_path} was cancelled')
                 break
-
-    # Finalize progress bar and reporter
-    file_progress.close()
-    reporter.finalize()
+            except Exception as e:
+                logger.error(f'Error analyzing file {file_path}: {str(e)}')
+                # Check if we should continue on error or if cancellation was requested
+                if cancel_callback():
+                    break
+    finally:
+        file_progress.close()
+        reporter.finalize()
 
     logger.info(
         f'Analysis completed. Analyzed {len(analyzed_files)}/{len(files)} files.'
@@ -783,12 +787,15 @@ class _TqdmLoggingHandler(logging.StreamHandler):
 # Replace existing stream handlers with the tqdm-compatible handler (once)
 _root_logger = logging.getLogger()
 if not any(isinstance(h, _TqdmLoggingHandler) for h in _root_logger.handlers):
-    # Remove existing standard StreamHandlers to avoid duplicate messages
+    _tqdm_handler = _TqdmLoggingHandler()
+    # Remove existing standard StreamHandlers to avoid duplicate messages,
+    # keeping their filters (e.g. the CLI's noisy-logger filter)
     for _h in list(_root_logger.handlers):
         if isinstance(_h, logging.StreamHandler):
             _root_logger.removeHandler(_h)
+            for _f in _h.filters:
+                _tqdm_handler.addFilter(_f)
 
-    _tqdm_handler = _TqdmLoggingHandler()
     _tqdm_handler.setFormatter(
         logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     )
@@ -1,12 +1,54 @@
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from csa.config import config
 
 logger = logging.getLogger(__name__)
 
 
+def _call_with_timeout(
+    func: Callable[..., Any], timeout: float, *args: Any, **kwargs: Any
+) -> Any:
+    """
+    Run a blocking call in a daemon thread and wait at most timeout seconds.
+
+    A call that times out is abandoned rather than joined. Each call gets
+    its own daemon thread, so a hung request neither delays later requests
+    nor blocks interpreter exit.
+
+    Args:
+        func: Callable to run
+        timeout: Timeout in seconds
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The return value of func
+
+    Raises:
+        TimeoutError: If func does not finish within timeout seconds
+    """
+    outcome: Dict[str, Any] = {}
+
+    def run() -> None:
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=run, name='csa-llm', daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        raise TimeoutError(f'LLM request timed out after {timeout} seconds')
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
 class LMStudioWebsocketError(Exception):
     """Exception raised when unable to connect to LM Studio websocket."""
 
@@ -19,6 +61,39 @@ class OllamaError(Exception):
     pass
 
 
+# Context window sizes for common Ollama model families, longest prefix
+# first so that e.g. 'qwen2.5-coder' is matched before 'qwen'
+_OLLAMA_CONTEXT_LENGTHS: Tuple[Tuple[str, int], ...] = tuple(
+    sorted(
+        {
+            'llama3': 8192,
+            'llama2': 4096,
+            'mistral': 8192,
+            'mixtral': 32768,
+            'qwen': 32768,
+            'phi3': 4096,
+            'gemma': 8192,
+            'qwen2': 32768,
+            'qwen2.5-coder': 32768,
+            'codellama': 16384,
+            'vicuna': 4096,
+            'wizardcoder': 16384,
+        }.items(),
+        key=lambda item: -len(item[0]),
+    )
+)
+
+# Whether the LM Studio websocket loggers have had their level set
+_LMSTUDIO_LOGGERS_CONFIGURED = False
+
+# Ollama clients by host, shared so that every provider for the same host
+# reuses one HTTP connection pool
+_OLLAMA_CLIENTS: Dict[str, Any] = {}
+
+# Response class -> content extractor, resolved on first sight of each class
+_EXTRACTOR_CACHE: Dict[type, Callable[[Any], str]] = {}
+
+
 def extract_response_content(response_obj: Any) -> str:
     """
     Extract text content from various LLM response object formats.
@@ -29,18 +104,50 @@ def extract_response_content(response_obj: Any) -> str:
     Returns:
         Extracted text content as string
     """
-    if hasattr(response_obj, 'content'):
-        return response_obj.content
-    elif hasattr(response_obj, 'prediction'):
-        return response_obj.prediction
-    else:
-        # Convert the object to string if no specific attribute found
-        return str(response_obj)
+    cls = type(response_obj)
+    extractor = _EXTRACTOR_CACHE.get(cls)
+    if extractor is None:
+        if hasattr(response_obj, 'content'):
+            extractor = attrgetter('content')
+        elif hasattr(response_obj, 'prediction'):
+            extractor = attrgetter('prediction')
+        else:
+            # Convert the object to string if no specific attribute found
+            extractor = str
+        _EXTRACTOR_CACHE[cls] = extractor
+    return extractor(response_obj)
+
+
+def _get_ollama_client(host: str) -> Any:
+    """
+    Return the shared Ollama client for a host, creating it on first use.
+
+    Args:
+        host: Host address of the Ollama server
+
+    Returns:
+        An ollama.Client instance
+    """
+    client = _OLLAMA_CLIENTS.get(host)
+    if client is None:
+        # Import here instead of at the top to make mocking easier for tests
+        from ollama import Client
+
+        client = Client(host=f'{host}', timeout=20.0)
+        _OLLAMA_CLIENTS[host] = client
+    return client
 
 
 class LLMProvider(ABC):
     """Base class for LLM providers."""
 
+    # Context length of the loaded model, memoized by get_context_length()
+    _cached_context_length: Optional[int] = None
+
+    def invalidate_context_length(self) -> None:
+        """Forget the memoized context length, e.g. after switching models."""
+        self._cached_context_length = None
+
     @abstractmethod
     def generate_response(self, prompt: str, timeout: Optional[int] = None) -> str:
         """
@@ -72,22 +179,28 @@ class LMStudioProvider(LLMProvider):
     Uses the LMSTUDIO_HOST configuration value to connect to a local LM Studio instance.
     """
 
-    def __init__(self, host: str | None = None):
+    def __init__(self, host: str | None = None, reinit_per_request: bool = False):
         """
         Initialize the LMStudio provider.
 
         Args:
             host: Host address for LMStudio (default: config.LMSTUDIO_HOST)
+            reinit_per_request: Re-acquire the model handle before every
+                request instead of reusing it (default: False)
         """
         self.host = host or config.LMSTUDIO_HOST
+        self.reinit_per_request = reinit_per_request
 
         # Import here instead of at the top to make mocking easier for tests
         try:
             import lmstudio as lms
 
-            # Set websocket-related loggers to DEBUG level
-            for logger_name in ['_AsyncWebsocketThread', 'SyncLMStudioWebsocket']:
-                logging.getLogger(logger_name).setLevel(logging.DEBUG)
+            # Set websocket-related loggers to DEBUG level (once per process)
+            global _LMSTUDIO_LOGGERS_CONFIGURED
+            if not _LMSTUDIO_LOGGERS_CONFIGURED:
+                for logger_name in ['_AsyncWebsocketThread', 'SyncLMStudioWebsocket']:
+                    logging.getLogger(logger_name).setLevel(logging.DEBUG)
+                _LMSTUDIO_LOGGERS_CONFIGURED = True
 
             self.lms = lms
 
@@ -116,33 +229,21 @@ class LMStudioProvider(LLMProvider):
             Generated response as string
         """
         try:
-            self.model = (
-                self.lms.llm()
-            )  # Important to reinitialize the model each time!
+            if self.reinit_per_request or getattr(self, 'model', None) is None:
+                self.model = self.lms.llm()
 
-            # Use timeout if provided
-            if timeout is not None:
-                import concurrent.futures
-
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                    # Submit the task to the executor
-                    future = executor.submit(self.model.respond, prompt)
-
-                    try:
-                        # Wait for the result with a timeout
-                        response_obj = future.result(timeout=timeout)
-                        return extract_response_content(response_obj)
-                    except concurrent.futures.TimeoutError:
-                        # Cancel the future if possible
-                        future.cancel()
-                        # Raise timeout for caller handling
-                        raise TimeoutError(
-                            f'LLM request timed out after {timeout} seconds'
-                        )
-            else:
-                # No timeout specified, use normal call
-                response_obj = self.model.respond(prompt)
-                return extract_response_content(response_obj)
+            try:
+                return self._respond(prompt, timeout)
+            except Exception as e:
+                if not self._is_connection_error(e):
+                    raise
+                # The cached handle went stale; reconnect and retry once
+                logger.warning(
+                    f'LM Studio connection lost ({str(e)}), reconnecting and retrying'
+                )
+                self.model = self.lms.llm()
+                self.invalidate_context_length()
+                return self._respond(prompt, timeout)
 
         except TimeoutError:
             # Re-raise timeout errors to be handled by the caller
@@ -153,6 +254,43 @@ class LMStudioProvider(LLMProvider):
                 f'Failed to get response from LM Studio: {str(e)}'
             ) from e
 
+    def _respond(self, prompt: str, timeout: Optional[int]) -> str:
+        """
+        Send a prompt to the current model handle.
+
+        Args:
+            prompt: The prompt to send to the LLM
+            timeout: Timeout in seconds for the request (None for no timeout)
+
+        Returns:
+            Generated response as string
+        """
+        # Use timeout if provided; raises TimeoutError for caller handling
+        if timeout is not None:
+            response_obj = _call_with_timeout(self.model.respond, timeout, prompt)
+        else:
+            # No timeout specified, use normal call
+            response_obj = self.model.respond(prompt)
+        return extract_response_content(response_obj)
+
+    def _is_connection_error(self, exc: Exception) -> bool:
+        """
+        Check whether an exception signals a dropped LM Studio connection.
+
+        Args:
+            exc: Exception raised while generating a response
+
+        Returns:
+            True if reconnecting may fix the error
+        """
+        # Imported here like the SDK itself, to make mocking easier for tests
+        from lmstudio import LMStudioChannelClosedError
+        from lmstudio import LMStudioWebsocketError as SDKWebsocketError
+
+        return isinstance(
+            exc, (ConnectionError, SDKWebsocketError, LMStudioChannelClosedError)
+        )
+
     def get_context_length(self) -> int:
         """
         Get the context length of the currently loaded model.
@@ -160,6 +298,9 @@ class LMStudioProvider(LLMProvider):
         Returns:
             The context length of the model in tokens
         """
+        if self._cached_context_length is not None:
+            return self._cached_context_length
+
         try:
             # Ensure model is initialized
             if not hasattr(self, 'model') or self.model is None:
@@ -167,6 +308,7 @@ class LMStudioProvider(LLMProvider):
 
             # Get context length from the model
             context_length = self.model.get_context_length()
+            self._cached_context_length = context_length
             return context_length
         except Exception as e:
             logger.warning(f'Failed to get context length from LM Studio: {str(e)}')
@@ -183,28 +325,29 @@ class OllamaProvider(LLMProvider):
 
         Args:
             host: Host address for Ollama (default: config.OLLAMA_HOST)
-            model: Model name to use (default: config.OLLAMA_MODEL or 'qwen2.5-coder:14b')
+            model: Model name to use (default: config.OLLAMA_MODEL)
         """
         self.host = host or config.OLLAMA_HOST
-        self.model_name = model or getattr(config, 'OLLAMA_MODEL', 'qwen2.5-coder:14b')
+        self.model_name = model or config.OLLAMA_MODEL
+        # Model names reported by the server at startup (empty if unknown)
+        self._available_models: frozenset = frozenset()
 
-        # Import here instead of at the top to make mocking easier for tests
         try:
-            from ollama import Client
-
-            # Initialize the Ollama client
-            self.client = Client(host=f'{self.host}', timeout=20.0)
+            # Initialize (or reuse) the Ollama client for this host
+            self.client = _get_ollama_client(self.host)
             logger.info(
                 f'Initialized Ollama provider with host: {self.host}, model: {self.model_name}'
             )
 
-            # Check if model exists
+            # Check if model exists; older clients report the model name
+            # under 'name', newer ones under 'model'
             try:
                 models = self.client.list()
-                if not any(
-                    model['name'] == self.model_name
+                self._available_models = frozenset(
+                    model.get('model') or model.get('name')
                     for model in models.get('models', [])
-                ):
+                )
+                if self.model_name not in self._available_models:
                     logger.warning(
                         f"Model {self.model_name} not found in Ollama. Please make sure it's available."
                     )
@@ -229,27 +372,12 @@ class OllamaProvider(LLMProvider):
             Generated response as string
         """
         try:
-            # Use timeout if provided
+            # Use timeout if provided; raises TimeoutError for caller handling
             if timeout is not None:
-                import concurrent.futures
-
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                    # Submit the task to the executor
-                    future = executor.submit(
-                        self.client.generate, model=self.model_name, prompt=prompt
-                    )
-
-                    try:
-                        # Wait for the result with a timeout
-                        response = future.result(timeout=timeout)
-                        return response.get('response', '')
-                    except concurrent.futures.TimeoutError:
-                        # Cancel the future if possible
-                        future.cancel()
-                        # Raise timeout for caller handling
-                        raise TimeoutError(
-                            f'LLM request timed out after {timeout} seconds'
-                        )
+                response = _call_with_timeout(
+                    self.client.generate, timeout, model=self.model_name, prompt=prompt
+                )
+                return response.get('response', '')
             else:
                 # No timeout specified, use normal call
                 response = self.client.generate(model=self.model_name, prompt=prompt)
@@ -268,12 +396,13 @@ class OllamaProvider(LLMProvider):
         Returns:
             The context length of the model in tokens
         """
+        if self._cached_context_length is not None:
+            return self._cached_context_length
+
         try:
             # Ensure model is initialized
             if not hasattr(self, 'client') or self.client is None:
-                from ollama import Client
-
-                self.client = Client(host=f'{self.host}', timeout=20.0)
+                self.client = _get_ollama_client(self.host)
 
             # Try to get direct context length from model info
             model_info = self.client.show(self.model_name)
@@ -290,41 +419,28 @@ class OllamaProvider(LLMProvider):
                         logger.info(
                             f'Context length for {self.model_name}: {context_length} tokens'
                         )
+                        self._cached_context_length = context_length
                         return context_length
 
             # Fall back to model family-based estimation
             model_base = (
-                self.model_name.split(':')[0].lower() if self.model_name else 'unknown'
+                self.model_name.partition(':')[0].lower() if self.model_name else 'unknown'
             )
 
-            # Context window sizes for common models
-            context_lengths = {
-                'llama3': 8192,
-                'llama2': 4096,
-                'mistral': 8192,
-                'mixtral': 32768,
-                'qwen': 32768,
-                'phi3': 4096,
-                'gemma': 8192,
-                'qwen2': 32768,
-                'qwen2.5-coder': 32768,
-                'codellama': 16384,
-                'vicuna': 4096,
-                'wizardcoder': 16384,
-            }
-
             # Check if we have a known context length for this model
-            for model_prefix, length in context_lengths.items():
+            for model_prefix, length in _OLLAMA_CONTEXT_LENGTHS:
                 if model_base.startswith(model_prefix):
                     logger.info(
                         f'Using estimated context length for {self.model_name}: {length} tokens'
                     )
+                    self._cached_context_length = length
                     return length
 
             # Return a conservative default if we don't recognize the model
             logger.warning(
                 f'Unknown model: {self.model_name}, using default context length of 8192 tokens'
             )
+            self._cached_context_length = 8192
             return 8192
         except Exception as e:
             logger.warning(f'Failed to get context length from Ollama: {str(e)}')
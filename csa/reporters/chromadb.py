@@ -1,7 +1,22 @@
+import hashlib
 import logging
 import os
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+import sqlite3
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit
 
 import chromadb
 from chromadb.config import Settings
@@ -11,6 +26,101 @@ from csa.reporters.reporters import BaseAnalysisReporter
 
 logger = logging.getLogger(__name__)
 
+# Sentence-transformers model used for embeddings and its vector size
+_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+_EMBEDDING_DIMENSION = 384
+
+# Embeddings in the plain-list form accepted by Collection.upsert
+_Embeddings = List[Union[Sequence[float], Sequence[int]]]
+
+# HNSW index parameters for the searchable collections: denser graph and
+# wider candidate lists than Chroma's defaults (M=16, construction_ef=100)
+# for better recall. Only applied when a collection is first created.
+_HNSW_METADATA = {
+    "hnsw:M": 24,
+    "hnsw:construction_ef": 128,
+    "hnsw:search_ef": 100,
+}
+
+# Characters replaced by underscores in ChromaDB record ids
+_SAFE_ID_TABLE = str.maketrans({"/": "_", "\\": "_", ".": "_", " ": "_"})
+
+
+class _FileContext(NamedTuple):
+    """Per-file values shared by every record stored for that file."""
+
+    file_path: str
+    rel_path: str
+    filename: str
+    extension: str
+    safe_id: str
+
+
+def _content_id(prefix: str, text: str) -> str:
+    """
+    Build a record id from a prefix and a hash of the record's content.
+
+    Args:
+        prefix: Id prefix identifying the file and item type
+        text: Record content
+
+    Returns:
+        Id that stays the same as long as the content does
+    """
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+    return f"{prefix}_{digest}"
+
+
+def _class_name(class_info: str) -> str:
+    """Extract the class name from a class description like 'Name: ...'."""
+    name, sep, _ = class_info.partition(":")
+    return name.strip() if sep else class_info
+
+
+def _function_name(function_info: str) -> str:
+    """Extract the function name from a signature like 'name(args)'."""
+    name, sep, _ = function_info.partition("(")
+    return name.strip() if sep else function_info
+
+
+def _module_name(dependency_info: str) -> str:
+    """Extract the module name from a dependency like 'import module'."""
+    _, sep, rest = dependency_info.partition(" ")
+    return rest.partition(" ")[0] if sep else dependency_info
+
+
+def _placeholder_embeddings(count: int) -> _Embeddings:
+    """
+    Return zero vectors for records that are never searched by similarity.
+
+    Args:
+        count: Number of records
+
+    Returns:
+        One zero vector of the embedding model's size per record
+    """
+    return [[0.0] * _EMBEDDING_DIMENSION for _ in range(count)]
+
+
+def _select_embedding_device() -> str:
+    """
+    Pick the torch device for the sentence-transformers model.
+
+    Returns:
+        "cuda" or "mps" if available, otherwise "cpu"
+    """
+    try:
+        import torch
+    except ImportError:
+        return "cpu"
+
+    if torch.cuda.is_available():
+        return "cuda"
+    mps = getattr(torch.backends, "mps", None)
+    if mps is not None and mps.is_available():
+        return "mps"
+    return "cpu"
+
 
 class ChromaDBAnalysisReporter(BaseAnalysisReporter):
     """
@@ -22,19 +132,39 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
     embeddings for semantic search.
     """
 
-    def __init__(self, output_dir: str = "data/chroma"):
+    def __init__(
+        self,
+        output_dir: str = "data/chroma",
+        batch_size: int = 200,
+        server_url: Optional[str] = None,
+        tune_sqlite: bool = True,
+    ):
         """
         Initialize the ChromaDB reporter.
 
         Args:
             output_dir: Directory path where the ChromaDB data will be stored
+            batch_size: Number of pending records per collection that triggers an upsert
+            server_url: URL of a running Chroma server (e.g. http://localhost:8000)
+                to store the data in instead of an embedded database in output_dir
+            tune_sqlite: Switch the embedded database's SQLite file to WAL journaling
         """
         # Normalize path to handle Windows backslashes properly
         self.output_dir = os.path.normpath(output_dir)
-        self.client: Optional[chromadb.PersistentClient] = None
+        self.server_url = server_url
+        self.tune_sqlite = tune_sqlite
+        self.client: Optional[chromadb.api.ClientAPI] = None
         self.collections: dict[str, chromadb.api.models.Collection] = {}
-        self.embedding_function = None
+        self.embedding_function: Any = None
         self.source_dir = ""
+        # Records waiting to be upserted, per collection and keyed by id so a
+        # later record replaces an earlier one with the same id (as upsert does)
+        self._buffers: Dict[str, Dict[str, Tuple[str, Dict[str, Any]]]] = {}
+        self._batch_size = batch_size
+        # Full batches are written by a single background worker so that
+        # embedding and SQLite writes overlap with the analysis of later files
+        self._flush_pool: Optional[ThreadPoolExecutor] = None
+        self._pending_flushes: List[Future] = []
         logger.info(f"ChromaDB reporter initialized with output_dir: {self.output_dir}")
 
     def initialize(self, files: List[str], source_dir: str) -> None:
@@ -56,19 +186,28 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
             logger.error(f"Error creating output directory {self.output_dir}: {str(e)}")
             raise
 
-        # Initialize ChromaDB client with persistent storage
+        # Initialize ChromaDB client, either for a server or with persistent storage
         try:
-            logger.info(f"Creating ChromaDB PersistentClient at path: {self.output_dir}")
-            self.client = chromadb.PersistentClient(
-                path=self.output_dir,
-                settings=Settings(anonymized_telemetry=False)
-            )
-            logger.info(f"ChromaDB PersistentClient created successfully")
+            if self.server_url:
+                logger.info(f"Creating ChromaDB HttpClient for server: {self.server_url}")
+                self.client = self._create_http_client(self.server_url)
+                logger.info("ChromaDB HttpClient created successfully")
+            else:
+                logger.info(f"Creating ChromaDB PersistentClient at path: {self.output_dir}")
+                self.client = chromadb.PersistentClient(
+                    path=self.output_dir,
+                    settings=Settings(anonymized_telemetry=False)
+                )
+                logger.info(f"ChromaDB PersistentClient created successfully")
+                if self.tune_sqlite:
+                    self._enable_sqlite_wal()
 
-            # Use sentence-transformers for embeddings
-            logger.info("Loading embedding function")
+            # Use sentence-transformers for embeddings, on a GPU when available
+            device = _select_embedding_device()
+            logger.info(f"Loading embedding function on device: {device}")
             self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name="all-MiniLM-L6-v2"
+                model_name=_EMBEDDING_MODEL,
+                device=device
             )
             logger.info("Embedding function loaded successfully")
 
@@ -91,7 +230,7 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
                     collection = self.client.get_or_create_collection(
                         name=name,
                         embedding_function=self.embedding_function,
-                        metadata={"description": description}
+                        metadata={"description": description, **_HNSW_METADATA}
                     )
                     self.collections[name] = collection
                     logger.info(f"Successfully created collection: {name}")
@@ -113,20 +252,23 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
             # Store basic project metadata
             try:
                 logger.info("Creating metadata collection")
+                # The metadata collection is only read by id, never searched,
+                # so its records get placeholder vectors instead of embeddings
                 metadata_collection = self.client.get_or_create_collection(
                     name="metadata",
-                    embedding_function=self.embedding_function
+                    embedding_function=None
                 )
 
                 # Add project metadata
                 logger.info("Adding project metadata")
                 metadata_collection.upsert(
                     ids=["project_info"],
+                    embeddings=_placeholder_embeddings(1),
                     documents=[f"Project analysis for {source_dir}"],
                     metadatas=[{
                         "source_dir": source_dir,
                         "file_count": len(files),
-                        "analysis_date": str(__import__('datetime').datetime.now())
+                        "analysis_date": str(datetime.now())
                     }]
                 )
 
@@ -155,6 +297,7 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
 
                 metadata_collection.upsert(
                     ids=file_ids,
+                    embeddings=_placeholder_embeddings(len(file_ids)),
                     documents=documents,
                     metadatas=file_metadatas
                 )
@@ -168,6 +311,61 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
             logger.error(f"Error initializing ChromaDB: {str(e)}")
             raise
 
+    def _enable_sqlite_wal(self) -> None:
+        """
+        Switch the embedded database to SQLite's write-ahead log.
+
+        The journal mode is stored in the database file, so Chroma's own
+        connections use it too; WAL avoids rewriting a rollback journal on
+        every committed write.
+        """
+        db_file = os.path.join(self.output_dir, "chroma.sqlite3")
+        try:
+            connection = sqlite3.connect(db_file, timeout=10)
+            try:
+                mode = connection.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            finally:
+                connection.close()
+            logger.info(f"ChromaDB SQLite journal mode: {mode}")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not enable WAL mode for {db_file}: {str(e)}")
+
+    @property
+    def source_dir(self) -> str:
+        """Source directory of the analyzed project."""
+        return self._source_dir
+
+    @source_dir.setter
+    def source_dir(self, value: str) -> None:
+        self._source_dir = value
+        # Normalized prefix (ending in a separator) of absolute paths below
+        # an absolute source directory, used by _get_relative_path
+        self._source_prefix: Optional[str] = (
+            os.path.normcase(os.path.join(os.path.normpath(value), ""))
+            if os.path.isabs(value)
+            else None
+        )
+
+    @staticmethod
+    def _create_http_client(server_url: str) -> chromadb.api.ClientAPI:
+        """
+        Create a client for a Chroma server.
+
+        Args:
+            server_url: Server URL such as http://localhost:8000
+
+        Returns:
+            ChromaDB HttpClient connected to the server
+        """
+        parts = urlsplit(server_url if "://" in server_url else f"http://{server_url}")
+        ssl = parts.scheme == "https"
+        return chromadb.HttpClient(
+            host=parts.hostname or "localhost",
+            port=parts.port or (443 if ssl else 8000),
+            ssl=ssl,
+            settings=Settings(anonymized_telemetry=False)
+        )
+
     def update_file_analysis(
         self, file_analysis: Dict[str, Any], source_dir: str, remaining_files: List[str]
     ) -> None:
@@ -206,14 +404,17 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
                 logger.error(f"Failed to reconnect to collections: {str(e)}")
                 return
 
+        ctx = self._file_context(file_path)
+
         # Handle error case
         if 'error' in file_analysis:
             logger.warning(f"Error in file analysis for {file_path}: {file_analysis['error']}")
             # Store error information
             try:
                 if "file_summaries" in self.collections:
-                    self.collections["file_summaries"].upsert(
-                        ids=[self._get_safe_id(file_path)],
+                    self._add_to_buffer(
+                        "file_summaries",
+                        ids=[ctx.safe_id],
                         documents=[f"Error analyzing file: {file_analysis['error']}"],
                         metadatas=[{
                             "file_path": file_path,
@@ -226,37 +427,31 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
             return
 
         # Process file summary
-        self._store_file_summary(file_analysis, file_path)
+        self._store_file_summary(file_analysis, ctx)
 
         # Process classes, functions, and dependencies
         analyses = file_analysis.get('analyses', [])
         if analyses:
-            classes = set()
-            functions = set()
-            dependencies = set()
-
-            # Gather all unique items from analyses
-            for analysis in analyses:
-                if 'classes' in analysis:
-                    for cls in analysis['classes']:
-                        classes.add(cls)
-
-                if 'functions' in analysis:
-                    for func in analysis['functions']:
-                        functions.add(func)
-
-                if 'dependencies' in analysis:
-                    for dep in analysis['dependencies']:
-                        dependencies.add(dep)
+            # Gather all unique items from analyses, in first-seen order so
+            # that records are written in the order they appear in the file
+            classes = dict.fromkeys(
+                cls for analysis in analyses for cls in analysis.get('classes') or ()
+            )
+            functions = dict.fromkeys(
+                func for analysis in analyses for func in analysis.get('functions') or ()
+            )
+            dependencies = dict.fromkeys(
+                dep for analysis in analyses for dep in analysis.get('dependencies') or ()
+            )
 
             # Store classes
-            self._store_classes(file_path, classes)
+            self._store_classes(ctx, classes)
 
             # Store functions
-            self._store_functions(file_path, functions)
+            self._store_functions(ctx, functions)
 
             # Store dependencies
-            self._store_dependencies(file_path, dependencies)
+            self._store_dependencies(ctx, dependencies)
 
     def finalize(self) -> None:
         """
@@ -266,6 +461,13 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
             logger.warning("ChromaDB client not initialized, nothing to finalize")
             return
 
+        # Write out records still waiting in the batch buffers
+        self._wait_for_pending_flushes()
+        self._flush_all()
+        if self._flush_pool is not None:
+            self._flush_pool.shutdown()
+            self._flush_pool = None
+
         # Update metadata with completion status
         try:
             if "metadata" in self.collections:
@@ -273,7 +475,7 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
                     ids=["project_info"],
                     metadatas=[{
                         "completed": True,
-                        "completion_date": str(__import__('datetime').datetime.now())
+                        "completion_date": str(datetime.now())
                     }]
                 )
 
@@ -289,6 +491,177 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
         except Exception as e:
             logger.error(f"Error finalizing ChromaDB: {str(e)}")
 
+    def _add_to_buffer(
+        self,
+        name: str,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Queue records for a collection and flush it once the batch is full.
+
+        Args:
+            name: Collection name
+            ids: Record IDs
+            documents: Record documents
+            metadatas: Record metadata
+        """
+        buffer = self._buffers.setdefault(name, {})
+        for record_id, document, metadata in zip(ids, documents, metadatas, strict=True):
+            buffer[record_id] = (document, metadata)
+        if len(buffer) >= self._batch_size:
+            self._flush_in_background(name)
+
+    def _flush_in_background(self, name: str) -> None:
+        """
+        Hand the queued records of a collection to the background writer.
+
+        Args:
+            name: Collection name
+        """
+        buffer = self._buffers.pop(name, None)
+        if not buffer:
+            return
+
+        if self._flush_pool is None:
+            self._flush_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="chromadb-flush"
+            )
+        self._pending_flushes = [f for f in self._pending_flushes if not f.done()]
+        self._pending_flushes.append(
+            self._flush_pool.submit(self._write_records, name, buffer)
+        )
+
+    def _wait_for_pending_flushes(self) -> None:
+        """Block until every background flush has been written."""
+        for future in self._pending_flushes:
+            future.result()
+        self._pending_flushes = []
+
+    def _write_records(
+        self,
+        name: str,
+        buffer: Dict[str, Tuple[str, Dict[str, Any]]],
+        embeddings: Optional[List[Any]] = None,
+    ) -> None:
+        """
+        Upsert a batch of records into a collection.
+
+        Args:
+            name: Collection name
+            buffer: Records keyed by id, as (document, metadata) pairs
+            embeddings: Precomputed embeddings in buffer order; computed here
+                if not given
+        """
+        try:
+            if embeddings is None:
+                embeddings = self._embed([document for document, _ in buffer.values()])
+        except Exception as e:
+            logger.error(f"Error computing embeddings for collection {name}: {str(e)}")
+
+        ids = list(buffer)
+        documents = [document for document, _ in buffer.values()]
+        metadatas = [metadata for _, metadata in buffer.values()]
+        try:
+            self.collections[name].upsert(
+                ids=ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=metadatas
+            )
+            logger.info("Stored %d records in collection %s", len(ids), name)
+        except Exception as e:
+            logger.error(f"Error storing {len(ids)} records in collection {name}: {str(e)}")
+
+    def _flush_all(self) -> None:
+        """Upsert the queued records of every collection."""
+        pending = [(name, buffer) for name, buffer in self._buffers.items() if buffer]
+        self._buffers = {}
+
+        # Embed the documents of all collections in one pass and give each
+        # collection its slice; on failure every collection embeds its own
+        documents = [document for _, buffer in pending for document, _ in buffer.values()]
+        try:
+            embeddings = self._embed(documents)
+        except Exception as e:
+            logger.error(f"Error computing embeddings for {len(documents)} records: {str(e)}")
+            embeddings = None
+
+        start = 0
+        for name, buffer in pending:
+            end = start + len(buffer)
+            self._write_records(
+                name, buffer, embeddings[start:end] if embeddings is not None else None
+            )
+            start = end
+
+    def _new_file_records(
+        self, name: str, ctx: _FileContext, records: Dict[str, str]
+    ) -> Dict[str, str]:
+        """
+        Replace a file's stored records in a collection with its current ones.
+
+        Stored records of the file whose id is not among the current ids are
+        deleted. Since ids are derived from the content, records that are
+        already stored are unchanged and need not be embedded again.
+
+        Args:
+            name: Collection name
+            ctx: Per-file values of the analyzed file
+            records: Current documents of the file, keyed by content id
+
+        Returns:
+            The records that are not stored yet
+        """
+        collection = self.collections[name]
+        try:
+            stored = set(
+                collection.get(where={"file_path": ctx.file_path}, include=[])["ids"]
+            )
+            stale = stored.difference(records)
+            if stale:
+                collection.delete(ids=list(stale))
+                logger.debug("Deleted %d outdated records from collection %s", len(stale), name)
+        except Exception as e:
+            logger.warning(f"Could not check stored records in collection {name}: {str(e)}")
+            return records
+        return {key: value for key, value in records.items() if key not in stored}
+
+    def _embed(self, documents: List[str]) -> Optional[List[Any]]:
+        """
+        Compute embeddings for documents with the reporter's embedding function.
+
+        Args:
+            documents: Documents to embed
+
+        Returns:
+            One embedding per document, or None if no embedding function is set
+        """
+        if self.embedding_function is None or not documents:
+            return None
+        return list(self.embedding_function(documents))
+
+    def _file_context(self, file_path: str) -> _FileContext:
+        """
+        Compute the per-file values shared by all records of a file.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            The file's context
+        """
+        # Interned so every record of the file, across all collections and
+        # repeated analyses, references a single copy of each string
+        return _FileContext(
+            file_path=sys.intern(file_path),
+            rel_path=sys.intern(self._get_relative_path(file_path)),
+            filename=sys.intern(os.path.basename(file_path)),
+            extension=os.path.splitext(file_path)[1],
+            safe_id=self._get_safe_id(file_path),
+        )
+
     def _get_safe_id(self, file_path: str) -> str:
         """
         Create a safe ID from a file path.
@@ -299,22 +672,21 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
         Returns:
             Safe ID string for ChromaDB
         """
-        # Remove special characters and replace with underscores
-        return file_path.replace('/', '_').replace('\\', '_').replace('.', '_').replace(' ', '_')
+        # Replace path separators, dots and spaces with underscores in one pass
+        return file_path.translate(_SAFE_ID_TABLE)
 
-    def _store_file_summary(self, file_analysis: Dict[str, Any], file_path: str) -> None:
+    def _store_file_summary(self, file_analysis: Dict[str, Any], ctx: _FileContext) -> None:
         """
         Store file summary in the database.
 
         Args:
             file_analysis: Analysis results for a file
-            file_path: Path to the file
+            ctx: Per-file values of the analyzed file
         """
         try:
             summary = file_analysis.get('summary', 'No summary available.')
 
             # Get file metadata
-            rel_path = self._get_relative_path(file_path)
             total_lines = file_analysis.get('total_lines', 0)
 
             # Check if collection exists before attempting to use it
@@ -323,181 +695,162 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
                 return
 
             # Store in summary collection
-            self.collections["file_summaries"].upsert(
-                ids=[self._get_safe_id(file_path)],
+            self._add_to_buffer(
+                "file_summaries",
+                ids=[ctx.safe_id],
                 documents=[summary],
                 metadatas=[{
-                    "file_path": file_path,
-                    "rel_path": rel_path,
-                    "filename": os.path.basename(file_path),
-                    "extension": os.path.splitext(file_path)[1],
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "extension": ctx.extension,
                     "total_lines": total_lines,
                     "has_error": file_analysis.get('has_errors', False),
                     "oversized_file": file_analysis.get('oversized_file', False),
                 }]
             )
-            logger.info(f"Successfully stored summary for {os.path.basename(file_path)}")
+            logger.info("Queued summary for %s", ctx.filename)
 
         except Exception as e:
-            logger.error(f"Error storing file summary for {file_path}: {str(e)}")
+            logger.error(f"Error storing file summary for {ctx.file_path}: {str(e)}")
 
-    def _store_classes(self, file_path: str, classes: Set[str]) -> None:
+    def _store_classes(self, ctx: _FileContext, classes: Collection[str]) -> None:
         """
         Store class information in the database.
 
         Args:
-            file_path: Path to the file
-            classes: Set of class names and information
+            ctx: Per-file values of the analyzed file
+            classes: Unique class names and information, in order
         """
-        if not classes:
-            return
-
         # Check if collection exists before attempting to use it
         if "classes" not in self.collections:
-            logger.error(f"Cannot store classes: classes collection not available")
+            if classes:
+                logger.error(f"Cannot store classes: classes collection not available")
             return
 
         try:
-            ids = []
-            documents = []
-            metadatas = []
-
-            rel_path = self._get_relative_path(file_path)
-
-            for i, class_info in enumerate(classes):
-                # Create a unique ID for each class
-                class_id = f"{self._get_safe_id(file_path)}_class_{i}"
-                ids.append(class_id)
-                documents.append(class_info)
-
-                # Extract class name from class_info if possible
-                class_name = class_info
-                if ":" in class_info:
-                    class_name = class_info.split(":", 1)[0].strip()
-
-                metadatas.append({
-                    "file_path": file_path,
-                    "rel_path": rel_path,
-                    "filename": os.path.basename(file_path),
-                    "class_name": class_name,
+            # Runs even without classes, so that removed ones are deleted
+            records = self._new_file_records(
+                "classes",
+                ctx,
+                {_content_id(f"{ctx.safe_id}_class", info): info for info in classes},
+            )
+            if not records:
+                return
+
+            metadatas = [
+                {
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "class_name": _class_name(class_info),
                     "type": "class"
-                })
+                }
+                for class_info in records.values()
+            ]
 
-            self.collections["classes"].upsert(
-                ids=ids,
-                documents=documents,
+            self._add_to_buffer(
+                "classes",
+                ids=list(records),
+                documents=list(records.values()),
                 metadatas=metadatas
             )
-            logger.info(f"Successfully stored {len(classes)} classes for {os.path.basename(file_path)}")
+            logger.info("Queued %d classes for %s", len(records), ctx.filename)
 
         except Exception as e:
-            logger.error(f"Error storing classes for {file_path}: {str(e)}")
+            logger.error(f"Error storing classes for {ctx.file_path}: {str(e)}")
 
-    def _store_functions(self, file_path: str, functions: Set[str]) -> None:
+    def _store_functions(self, ctx: _FileContext, functions: Collection[str]) -> None:
         """
         Store function information in the database.
 
         Args:
-            file_path: Path to the file
-            functions: Set of function names and information
+            ctx: Per-file values of the analyzed file
+            functions: Unique function names and information, in order
         """
-        if not functions:
-            return
-
         # Check if collection exists before attempting to use it
         if "functions" not in self.collections:
-            logger.error(f"Cannot store functions: functions collection not available")
+            if functions:
+                logger.error(f"Cannot store functions: functions collection not available")
             return
 
         try:
-            ids = []
-            documents = []
-            metadatas = []
-
-            rel_path = self._get_relative_path(file_path)
-
-            for i, function_info in enumerate(functions):
-                # Create a unique ID for each function
-                function_id = f"{self._get_safe_id(file_path)}_function_{i}"
-                ids.append(function_id)
-                documents.append(function_info)
-
-                # Extract function name from function_info if possible
-                function_name = function_info
-                if "(" in function_info:
-                    function_name = function_info.split("(", 1)[0].strip()
-
-                metadatas.append({
-                    "file_path": file_path,
-                    "rel_path": rel_path,
-                    "filename": os.path.basename(file_path),
-                    "function_name": function_name,
+            # Runs even without functions, so that removed ones are deleted
+            records = self._new_file_records(
+                "functions",
+                ctx,
+                {_content_id(f"{ctx.safe_id}_function", info): info for info in functions},
+            )
+            if not records:
+                return
+
+            metadatas = [
+                {
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "function_name": _function_name(function_info),
                     "type": "function"
-                })
+                }
+                for function_info in records.values()
+            ]
 
-            self.collections["functions"].upsert(
-                ids=ids,
-                documents=documents,
+            self._add_to_buffer(
+                "functions",
+                ids=list(records),
+                documents=list(records.values()),
                 metadatas=metadatas
             )
-            logger.info(f"Successfully stored {len(functions)} functions for {os.path.basename(file_path)}")
+            logger.info("Queued %d functions for %s", len(records), ctx.filename)
 
         except Exception as e:
-            logger.error(f"Error storing functions for {file_path}: {str(e)}")
+            logger.error(f"Error storing functions for {ctx.file_path}: {str(e)}")
 
-    def _store_dependencies(self, file_path: str, dependencies: Set[str]) -> None:
+    def _store_dependencies(self, ctx: _FileContext, dependencies: Collection[str]) -> None:
         """
         Store dependency information in the database.
 
         Args:
-            file_path: Path to the file
-            dependencies: Set of dependency information
+            ctx: Per-file values of the analyzed file
+            dependencies: Unique dependency information, in order
         """
-        if not dependencies:
-            return
-
         # Check if collection exists before attempting to use it
         if "dependencies" not in self.collections:
-            logger.error(f"Cannot store dependencies: dependencies collection not available")
+            if dependencies:
+                logger.error(f"Cannot store dependencies: dependencies collection not available")
             return
 
         try:
-            ids = []
-            documents = []
-            metadatas = []
-
-            rel_path = self._get_relative_path(file_path)
-
-            for i, dependency_info in enumerate(dependencies):
-                # Create a unique ID for each dependency
-                dependency_id = f"{self._get_safe_id(file_path)}_dependency_{i}"
-                ids.append(dependency_id)
-                documents.append(dependency_info)
-
-                # Extract module name from dependency_info if possible
-                module_name = dependency_info
-                if " " in dependency_info:
-                    parts = dependency_info.split(" ", 2)
-                    if len(parts) >= 2:
-                        module_name = parts[1]
-
-                metadatas.append({
-                    "file_path": file_path,
-                    "rel_path": rel_path,
-                    "filename": os.path.basename(file_path),
-                    "module_name": module_name,
+            # Runs even without dependencies, so that removed ones are deleted
+            records = self._new_file_records(
+                "dependencies",
+                ctx,
+                {_content_id(f"{ctx.safe_id}_dependency", info): info for info in dependencies},
+            )
+            if not records:
+                return
+
+            metadatas = [
+                {
+                    "file_path": ctx.file_path,
+                    "rel_path": ctx.rel_path,
+                    "filename": ctx.filename,
+                    "module_name": _module_name(dependency_info),
                     "type": "dependency"
-                })
+                }
+                for dependency_info in records.values()
+            ]
 
-            self.collections["dependencies"].upsert(
-                ids=ids,
-                documents=documents,
+            self._add_to_buffer(
+                "dependencies",
+                ids=list(records),
+                documents=list(records.values()),
                 metadatas=metadatas
             )
-            logger.info(f"Successfully stored {len(dependencies)} dependencies for {os.path.basename(file_path)}")
+            logger.info("Queued %d dependencies for %s", len(records), ctx.filename)
 
         except Exception as e:
-            logger.error(f"Error storing dependencies for {file_path}: {str(e)}")
+            logger.error(f"Error storing dependencies for {ctx.file_path}: {str(e)}")
 
     def _get_relative_path(self, file_path: str) -> str:
         """
@@ -509,23 +862,15 @@ class ChromaDBAnalysisReporter(BaseAnalysisReporter):
         Returns:
             Relative path
         """
-        try:
-            file_path_obj = Path(file_path)
-            source_path = Path(self.source_dir)
-
-            # For absolute paths, try to make them relative to source_dir
-            if file_path_obj.is_absolute() and source_path.is_absolute():
-                try:
-                    rel_path = str(file_path_obj.relative_to(source_path))
-                except ValueError:
-                    # If not a subpath, just use the filename
-                    rel_path = file_path_obj.name
-            else:
-                # For relative paths, use as is
-                rel_path = file_path
-
-            return rel_path
-
-        except Exception:
-            # Fallback to basename if there's an error
-            return os.path.basename(file_path)
\ No newline at end of file
+        # For absolute paths, try to make them relative to source_dir
+        if self._source_prefix is not None and os.path.isabs(file_path):
+            # Test and slice the same normalized string, so that "..", "./"
+            # or doubled separators cannot shift the slice
+            file_path = os.path.normpath(file_path)
+            if os.path.normcase(file_path).startswith(self._source_prefix):
+                return file_path[len(self._source_prefix):]
+            # If not a subpath, just use the filename
+            return os.path.basename(file_path)
+
+        # For relative paths, use as is
+        return file_path
\ No newline at end of file
@@ -9,6 +9,9 @@ from chromadb.utils import embedding_functions
 
 logger = logging.getLogger(__name__)
 
+# Characters replaced by underscores in ChromaDB record ids
+_SAFE_ID_TABLE = str.maketrans({"/": "_", "\\": "_", ".": "_", " ": "_"})
+
 
 class ChromaDBAnalysisRetriever:
     """
@@ -480,5 +483,5 @@ class ChromaDBAnalysisRetriever:
         Returns:
             Safe ID string for ChromaDB
         """
-        # Remove special characters and replace with underscores
-        return file_path.replace('/', '_').replace('\\', '_').replace('.', '_').replace(' ', '_')
\ No newline at end of file
+        # Replace path separators, dots and spaces with underscores in one pass
+        return file_path.translate(_SAFE_ID_TABLE)
\ No newline at end of file
@@ -5,7 +5,7 @@ from pathlib import Path
 import pytest
 
 from csa.code_analyzer import CodeAnalyzer, get_code_analyzer
-from csa.llm import LLMProvider, get_llm_provider
+from csa.llm import LLMProvider, LMStudioWebsocketError, get_llm_provider
 
 
 @pytest.fixture
@@ -84,12 +84,9 @@ def llm_provider():
     """
     try:
         return get_llm_provider()
-    except Exception as e:
-        # If we can't connect to LM Studio, return a mock provider
-        if 'LMStudioWebsocketError' in str(type(e)):
-            pytest.skip('LM Studio is not running, using mock LLM provider')
-            return mock_llm_provider()
-        raise
+    except LMStudioWebsocketError:
+        # If we can't connect to LM Studio, skip tests that need it
+        pytest.skip('LM Studio is not running, using mock LLM provider')
 
 
 @pytest.fixture
@@ -123,12 +120,9 @@ def code_analyzer():
     """
     try:
         return get_code_analyzer()
-    except Exception as e:
-        # If we can't connect to LM Studio, use a mock provider
-        if 'LMStudioWebsocketError' in str(type(e)):
-            pytest.skip('LM Studio is not running, using mock code analyzer')
-            return mock_code_analyzer(mock_llm_provider())
-        raise
+    except LMStudioWebsocketError:
+        # If we can't connect to LM Studio, skip tests that need it
+        pytest.skip('LM Studio is not running, using mock code analyzer')
 
 
 @pytest.fixture
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -293,3 +294,20 @@ def test_markdown_reporter_extract_remaining_files(temp_dir):
     assert remaining_files is not None
     assert len(remaining_files) == 1
     assert os.path.basename(remaining_files[0]) == 'extract_test.py'
+
+
+def test_analyze_codebase_finalizes_reporter_when_interrupted(temp_dir):
+    """The reporter is finalized even if the file loop raises."""
+    reporter = MagicMock()
+    with patch('csa.analyzer.CodeAnalyzer') as mock_analyzer_cls, patch(
+        'csa.analyzer.collect_files', return_value=(reporter, ['a.py'])
+    ), patch('csa.analyzer.process_file', side_effect=KeyboardInterrupt):
+        mock_analyzer_cls.return_value.get_context_length.return_value = 8192
+        with pytest.raises(KeyboardInterrupt):
+            analyze_codebase(
+                source_dir=temp_dir,
+                output_file=str(Path(temp_dir) / 'output.md'),
+                llm_provider=MagicMock(),
+            )
+
+    reporter.finalize.assert_called_once()
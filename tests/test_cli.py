@@ -1,9 +1,17 @@
+import os
+import signal
 import socket
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from csa.cli import check_host_reachable, main, parse_args
+from csa.cli import (
+    check_host_reachable,
+    create_parser,
+    main,
+    parse_args,
+    validate_host_format,
+)
 from csa.config import config
 from csa.llm import LMStudioWebsocketError, OllamaError
 
@@ -11,7 +19,7 @@ from csa.llm import LMStudioWebsocketError, OllamaError
 def test_parse_args():
     """Test command-line argument parsing."""
     with patch('sys.argv', ['cli.py', '/test/dir']):
-        args = parse_args()
+        args, _ = parse_args()
         assert args.source_dir == '/test/dir'
         assert args.output == config.OUTPUT_FILE
         assert args.chunk_size == config.CHUNK_SIZE
@@ -21,14 +29,22 @@ def test_parse_args():
         assert args.ollama_host is None
 
 
-@patch('csa.cli.analyze_codebase', return_value='/tmp/output.md')
+def test_create_parser_is_reused():
+    """The parser is built once and shared between calls."""
+    assert create_parser() is create_parser()
+    args = create_parser().parse_args(['/first'])
+    assert create_parser().parse_args(['/second']).source_dir == '/second'
+    assert args.source_dir == '/first'
+
+
+@patch('csa.analyzer.analyze_codebase', return_value='/tmp/output.md')
 @patch('csa.cli.LMStudioProvider')
 def test_main_with_source_dir_returns_zero(mock_provider_cls, mock_analyze_codebase):
     """Main flow should return 0 for successful analysis."""
     mock_provider_cls.return_value = MagicMock()
 
     with patch('sys.argv', ['cli.py', '/test/dir']), patch(
-        'os.path.exists', return_value=True
+        'os.path.isdir', return_value=True
     ):
         result = main()
 
@@ -36,11 +52,74 @@ def test_main_with_source_dir_returns_zero(mock_provider_cls, mock_analyze_codeb
     assert mock_analyze_codebase.call_count == 1
 
 
+@patch('csa.analyzer.analyze_codebase', return_value='/tmp/output.md')
+@patch('csa.cli.LMStudioProvider')
+@patch('os.path.isdir', return_value=True)
+def test_main_strips_include_patterns(mock_isdir, mock_provider_cls, mock_analyze_codebase):
+    """Include patterns should be stripped and empty entries dropped before analysis."""
+    mock_provider_cls.return_value = MagicMock()
+
+    with patch('sys.argv', ['cli.py', '--include', ' *.py , ,*.cs,', '/test/dir']):
+        result = main()
+
+    assert result == 0
+    _, kwargs = mock_analyze_codebase.call_args
+    assert kwargs['include_patterns'] == ['*.py', '*.cs']
+    assert kwargs['exclude_patterns'] is None
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='POSIX runs the analysis on the main thread')
+@patch('csa.cli.LMStudioProvider')
+@patch('os.path.isdir', return_value=True)
+def test_main_sigint_requests_cancellation(mock_isdir, mock_provider_cls):
+    """CTRL+C during analysis should flag cancellation instead of aborting the run."""
+    mock_provider_cls.return_value = MagicMock()
+    seen = {}
+
+    def fake_analyze(**kwargs):
+        signal.raise_signal(signal.SIGINT)
+        seen['cancelled'] = kwargs['cancel_callback']()
+        return '/tmp/output.md'
+
+    previous_handler = signal.getsignal(signal.SIGINT)
+    with patch('csa.analyzer.analyze_codebase', side_effect=fake_analyze), patch(
+        'sys.argv', ['cli.py', '/test/dir']
+    ):
+        result = main()
+
+    assert seen['cancelled'] is True
+    assert result == 1
+    assert signal.getsignal(signal.SIGINT) is previous_handler
+
+
+@patch('csa.cli.check_dependencies')
+def test_main_help_fast_path(mock_check_dependencies, capsys):
+    """--help should print usage and examples without running any setup."""
+    with patch('sys.argv', ['cli.py', '.', '--help']):
+        result = main()
+
+    captured = capsys.readouterr()
+    assert result == 0
+    assert 'usage:' in captured.out
+    assert 'Examples:' in captured.out
+    mock_check_dependencies.assert_not_called()
+
+
+def test_parse_args_help_prints_examples_once(capsys):
+    """argparse's help action should print the examples epilog exactly once."""
+    with patch('sys.argv', ['cli.py', '--help']):
+        with pytest.raises(SystemExit) as excinfo:
+            parse_args()
+
+    assert excinfo.value.code == 0
+    assert capsys.readouterr().out.count('Examples:') == 1
+
+
 @patch('csa.cli.create_parser')
 def test_main_without_source_dir(mock_create_parser):
     """Main should print help and return 1 when source_dir is missing."""
     mock_parser = MagicMock()
-    mock_parser.parse_args.return_value = MagicMock(source_dir=None, help=False)
+    mock_parser.parse_args.return_value = MagicMock(source_dir=None)
     mock_create_parser.return_value = mock_parser
 
     with patch('sys.argv', ['cli.py']):
@@ -61,16 +140,48 @@ def test_main_source_dir_not_found():
         )
 
 
-@patch('os.path.exists', return_value=True)
-def test_main_with_invalid_llm_provider(mock_exists):
-    """Main should fail fast for unsupported provider names."""
+def test_main_source_dir_is_file(tmp_path):
+    """Main should raise NotADirectoryError when source_dir points at a file."""
+    source_file = tmp_path / 'not_a_dir.py'
+    source_file.write_text('', encoding='utf-8')
+
+    with patch('sys.argv', ['cli.py', str(source_file)]):
+        with pytest.raises(NotADirectoryError):
+            main()
+
+
+@patch('csa.cli.check_dependencies')
+def test_main_with_invalid_llm_provider(mock_check_dependencies, capsys):
+    """Unsupported provider names are rejected while parsing arguments."""
     with patch('sys.argv', ['cli.py', '.', '--llm-provider', 'invalid_provider']):
-        with patch('builtins.print') as mock_print:
-            result = main()
-    assert result == 1
-    mock_print.assert_any_call('\nERROR: Unsupported LLM provider: invalid_provider')
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+
+    assert excinfo.value.code == 2
+    assert "invalid choice: 'invalid_provider'" in capsys.readouterr().err
+    mock_check_dependencies.assert_not_called()
+
 
+def test_parse_args_normalises_provider_case():
+    """Provider names are matched case-insensitively."""
+    with patch('sys.argv', ['cli.py', '.', '--llm-provider', 'Ollama']):
+        args, _ = parse_args()
+    assert args.llm_provider == 'ollama'
 
+
+@patch('csa.cli.check_dependencies')
+def test_main_rejects_flag_like_include_pattern(mock_check_dependencies, capsys):
+    """Flags swallowed into --include are reported as a usage error."""
+    with patch('sys.argv', ['cli.py', '--include', '*.cs,--folders', '.']):
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+
+    assert excinfo.value.code == 2
+    assert 'invalid pattern(s) --folders' in capsys.readouterr().err
+    mock_check_dependencies.assert_not_called()
+
+
+@patch.dict('csa.cli._reachability_cache', clear=True)
 @patch('socket.create_connection')
 def test_check_host_reachable(mock_create_connection):
     """check_host_reachable should use per-socket timeout and no global timeout."""
@@ -87,6 +198,43 @@ def test_check_host_reachable(mock_create_connection):
     assert result is False
 
 
+@patch.dict('csa.cli._reachability_cache', clear=True)
+@patch('socket.create_connection')
+def test_check_host_reachable_caches_result(mock_create_connection):
+    """Repeated checks of the same host:port should reuse the cached result."""
+    mock_create_connection.side_effect = socket.error()
+
+    assert check_host_reachable('localhost', '1234') is False
+    assert check_host_reachable('localhost', 1234) is False
+    assert mock_create_connection.call_count == 1
+
+    with patch('csa.cli.time.monotonic', return_value=float('inf')):
+        check_host_reachable('localhost', 1234)
+    assert mock_create_connection.call_count == 2
+
+
+@pytest.mark.parametrize(
+    'host_value, expected_valid, expected_host',
+    [
+        ('localhost:1234', True, 'localhost:1234'),
+        ('http://localhost:1234', True, 'localhost:1234'),
+        ('http://localhost', True, 'localhost:80'),
+        ('https://localhost', True, 'localhost:443'),
+        ('http://localhost:1234/v1/', True, 'localhost:1234'),
+        ('http://user@localhost:1234', True, 'localhost:1234'),
+        ('http://localhost:notaport', False, None),
+        ('http://[::1]:1234', False, None),
+        ('http://', False, None),
+        ('localhost', False, None),
+    ],
+)
+def test_validate_host_format(host_value, expected_valid, expected_host):
+    """Host values should accept hostname:port and convert http(s) URLs."""
+    is_valid, converted_host, _ = validate_host_format(host_value)
+    assert is_valid is expected_valid
+    assert converted_host == expected_host
+
+
 @pytest.mark.parametrize(
     'argv, expected_lmstudio_host, expected_ollama_host',
     [
@@ -130,11 +278,11 @@ def test_check_host_reachable(mock_create_connection):
         ),
     ],
 )
-@patch('csa.cli.analyze_codebase', return_value='/tmp/output.md')
+@patch('csa.analyzer.analyze_codebase', return_value='/tmp/output.md')
 @patch('csa.cli.check_host_reachable', return_value=True)
-@patch('os.path.exists', return_value=True)
+@patch('os.path.isdir', return_value=True)
 def test_host_precedence(
-    mock_exists,
+    mock_isdir,
     mock_reachable,
     mock_analyze_codebase,
     argv,
@@ -160,11 +308,36 @@ def test_host_precedence(
         mock_lm_cls.assert_not_called()
 
 
-@patch('os.path.exists', return_value=True)
+@patch('csa.analyzer.analyze_codebase', return_value='/tmp/output.md')
+@patch('csa.cli.check_host_reachable', return_value=True)
+@patch('csa.cli.OllamaProvider')
+@patch('os.path.isdir', return_value=True)
+def test_main_validates_repeated_host_once(
+    mock_isdir, mock_ollama_cls, mock_reachable, mock_analyze_codebase
+):
+    """The same host given for several options is validated and probed once."""
+    mock_ollama_cls.return_value = MagicMock()
+    argv = [
+        'cli.py', '/test/dir', '--llm-provider', 'ollama',
+        '--llm-host', 'http://myhost:11434', '--ollama-host', 'http://myhost:11434',
+    ]
+
+    with patch('sys.argv', argv), patch(
+        'csa.cli.validate_host_format', wraps=validate_host_format
+    ) as mock_validate:
+        result = main()
+
+    assert result == 0
+    mock_validate.assert_called_once_with('http://myhost:11434')
+    mock_reachable.assert_called_once_with('myhost', '11434')
+    mock_ollama_cls.assert_called_once_with(host='myhost:11434', model=config.OLLAMA_MODEL)
+
+
+@patch('os.path.isdir', return_value=True)
 @patch('csa.cli.LMStudioProvider')
-@patch('csa.cli.analyze_codebase', side_effect=LMStudioWebsocketError('boom'))
+@patch('csa.analyzer.analyze_codebase', side_effect=LMStudioWebsocketError('boom'))
 def test_main_handles_lmstudio_error(
-    mock_analyze_codebase, mock_provider_cls, mock_exists, capsys
+    mock_analyze_codebase, mock_provider_cls, mock_isdir, capsys
 ):
     """LM Studio errors should hit provider-specific error handling."""
     mock_provider_cls.return_value = MagicMock()
@@ -180,11 +353,11 @@ def test_main_handles_lmstudio_error(
     assert 'Unable to connect to LM Studio at local:1234' in captured.out
 
 
-@patch('os.path.exists', return_value=True)
+@patch('os.path.isdir', return_value=True)
 @patch('csa.cli.OllamaProvider')
-@patch('csa.cli.analyze_codebase', side_effect=OllamaError('boom'))
+@patch('csa.analyzer.analyze_codebase', side_effect=OllamaError('boom'))
 def test_main_handles_ollama_error(
-    mock_analyze_codebase, mock_provider_cls, mock_exists, capsys
+    mock_analyze_codebase, mock_provider_cls, mock_isdir, capsys
 ):
     """Ollama errors should hit provider-specific error handling."""
     mock_provider_cls.return_value = MagicMock()
@@ -198,3 +371,48 @@ def test_main_handles_ollama_error(
     captured = capsys.readouterr()
     assert result == 1
     assert 'Unable to connect to Ollama at local:11434' in captured.out
+
+
+def test_configure_logging_without_log_file(tmp_path, monkeypatch):
+    """CSA_LOG_FILE=off configures console logging but opens no log file."""
+    import logging
+
+    import csa.cli
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('CSA_LOG_FILE', 'off')
+    monkeypatch.setattr(csa.cli, '_logging_configured', False)
+    monkeypatch.setattr(csa.cli, '_log_listener', None)
+    root_logger = logging.getLogger()
+    handlers_before = list(root_logger.handlers)
+    monkeypatch.setattr(root_logger, 'handlers', list(handlers_before))
+    monkeypatch.setattr(root_logger, 'level', root_logger.level)
+
+    csa.cli._configure_logging()
+
+    assert csa.cli._logging_configured is True
+    assert csa.cli._log_listener is None
+    assert not any(
+        isinstance(h, logging.handlers.QueueHandler)
+        for h in root_logger.handlers
+        if h not in handlers_before
+    )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_noisy_logger_filter():
+    """Websocket/HTTP client records are dropped unless logging is verbose."""
+    import logging
+
+    from csa.cli import _NoisyLoggerFilter
+
+    def record(name):
+        return logging.LogRecord(name, logging.INFO, __file__, 1, 'msg', None, None)
+
+    noisy_filter = _NoisyLoggerFilter()
+    assert not noisy_filter.filter(record('httpx'))
+    assert not noisy_filter.filter(record('AsyncWebsocketThread'))
+    assert noisy_filter.filter(record('csa.cli'))
+
+    noisy_filter.verbose = True
+    assert noisy_filter.filter(record('httpx'))
@@ -1,6 +1,9 @@
+import os
 from pathlib import Path
 from unittest.mock import patch
 
+import pytest
+
 from csa.config import config
 
 
@@ -39,6 +42,13 @@ def test_get_output_path(tmp_path, monkeypatch):
     assert absolute_path == absolute_output
 
 
+@pytest.mark.skipif(os.name == 'nt', reason='separator conversion is POSIX-only')
+def test_get_output_path_converts_backslashes(tmp_path, monkeypatch):
+    """Relative Windows-style paths resolve under the working directory."""
+    monkeypatch.chdir(tmp_path)
+    assert config.get_output_path('docs\\out.md') == tmp_path / 'docs' / 'out.md'
+
+
 def test_env_variables():
     """Test that environment variables are loaded correctly."""
     # Use dotenv to load the values directly from the .env file
@@ -108,6 +118,117 @@ def test_singleton_instance():
         config.CHUNK_SIZE = original_chunk_size
 
 
+def test_file_extensions_are_normalized(monkeypatch):
+    """Configured extensions are lowercased and given a leading dot."""
+    monkeypatch.setenv('FILE_EXTENSIONS', ' PY,.Cs,, md ')
+    try:
+        config.reload_from_env()
+        assert config.FILE_EXTENSIONS == frozenset({'.py', '.cs', '.md'})
+    finally:
+        monkeypatch.undo()
+        config.reload_from_env()
+
+
+@pytest.mark.parametrize(
+    'value,expected',
+    [
+        ('true', True),
+        ('Yes', True),
+        ('1', True),
+        (' TRUE ', True),
+        ('False', False),
+        ('0', False),
+        ('', False),
+        ('10', False),
+        ('tomorrow', False),
+        ('yes-no', False),
+    ],
+)
+def test_strtobool(value, expected):
+    """Environment flags accept the usual truthy spellings."""
+    from csa.config import _strtobool
+
+    assert _strtobool(value) is expected
+
+
+@pytest.mark.parametrize(
+    'url,expected',
+    [
+        ('http://localhost', 'localhost:80'),
+        ('https://example.com/v1', 'example.com:443'),
+        ('https://example.com:8443', 'example.com:8443'),
+        ('http://localhost:99999', None),
+        ('http://[::1]:1234', None),
+    ],
+)
+def test_url_to_host_port(url, expected):
+    """URLs convert to hostname:port with the scheme's default port."""
+    from csa.config import url_to_host_port
+
+    assert url_to_host_port(url) == expected
+
+
+def test_env_host_url_uses_scheme_default_port(monkeypatch):
+    """An https host from the environment resolves to port 443, as on the CLI."""
+    monkeypatch.setenv('LLM_PROVIDER', 'lmstudio')
+    monkeypatch.setenv('LMSTUDIO_HOST', 'https://example.com')
+    try:
+        config.reload_from_env()
+        assert config.LMSTUDIO_HOST == 'example.com:443'
+    finally:
+        monkeypatch.undo()
+        config.reload_from_env()
+
+
+def test_reload_from_env_updates_in_place(monkeypatch):
+    """Reloading keeps the singleton object and refreshes its values."""
+    from csa.config import Config, restore_original_instance
+
+    restore_original_instance()
+    monkeypatch.setenv('CHUNK_SIZE', '321')
+    try:
+        assert Config.reload() is config
+        assert config.CHUNK_SIZE == 321
+    finally:
+        monkeypatch.undo()
+        config.reload_from_env()
+
+
+def test_reload_parses_dotenv_only_when_forced():
+    """The .env file is parsed once unless a reload asks for it again."""
+    from csa.config import Config, restore_original_instance
+
+    restore_original_instance()
+    with patch('csa.config.dotenv.load_dotenv') as mock_load_dotenv:
+        Config.reload()
+        mock_load_dotenv.assert_not_called()
+
+        Config.reload(force_dotenv=True)
+        mock_load_dotenv.assert_called_once()
+
+
+def test_reload_parses_dotenv_again_when_modified(tmp_path):
+    """A modified .env file is picked up by the next reload."""
+    from csa.config import Config, restore_original_instance
+
+    restore_original_instance()
+    env_file = tmp_path / '.env'
+    env_file.write_text('CHUNK_SIZE=200\n', encoding='utf-8')
+    with patch('csa.config.dotenv.load_dotenv') as mock_load_dotenv, patch(
+        'csa.config.dotenv.find_dotenv', return_value=str(env_file)
+    ):
+        Config.reload(force_dotenv=True)
+        Config.reload()
+        assert mock_load_dotenv.call_count == 1
+
+        mtime = os.path.getmtime(env_file)
+        os.utime(env_file, (mtime + 10, mtime + 10))
+        Config.reload()
+        assert mock_load_dotenv.call_count == 2
+
+    Config.reload(force_dotenv=True)
+
+
 def test_invalid_llm_config():
     """Test validation of invalid LLM configuration."""
     import os
@@ -1,5 +1,8 @@
 import os
+import subprocess
+import sys
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 from csa.reporters import BaseAnalysisReporter, MarkdownAnalysisReporter
 
@@ -216,3 +219,261 @@ def test_mermaid_diagram_uses_unique_nodes_for_duplicate_basenames(temp_dir):
 
     assert 'a/utils.py' in diagram
     assert 'b/utils.py' in diagram
+
+
+def test_markdown_reporter_import_does_not_load_chromadb():
+    """Only the reporter that is used gets imported."""
+    code = (
+        'import sys; from csa.reporters import MarkdownAnalysisReporter; '
+        'print("chromadb" in sys.modules)'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parents[1],
+    )
+    assert result.stdout.strip() == 'False'
+
+
+def _chromadb_reporter(source_dir, batch_size=200):
+    """Build a ChromaDB reporter wired to mocked collections."""
+    from csa.reporters.chromadb import ChromaDBAnalysisReporter
+
+    reporter = ChromaDBAnalysisReporter(str(source_dir / 'db'), batch_size=batch_size)
+    reporter.client = MagicMock()
+    reporter.source_dir = str(source_dir)
+    reporter.collections = {
+        name: MagicMock()
+        for name in ('file_summaries', 'classes', 'functions', 'dependencies', 'metadata')
+    }
+    return reporter
+
+
+def test_chromadb_reporter_batches_upserts(temp_dir):
+    """Records are upserted per batch, in the background, rather than per file."""
+    reporter = _chromadb_reporter(Path(temp_dir), batch_size=2)
+    for name in ('a.py', 'b.py', 'c.py'):
+        reporter.update_file_analysis(
+            {
+                'file_path': os.path.join(temp_dir, name),
+                'summary': f'Summary of {name}',
+                'analyses': [{'classes': [f'{name}Class: a class']}],
+            },
+            temp_dir,
+            [],
+        )
+
+    reporter._wait_for_pending_flushes()
+    summaries = reporter.collections['file_summaries']
+    assert summaries.upsert.call_count == 1
+    assert len(summaries.upsert.call_args.kwargs['ids']) == 2
+
+    reporter.finalize()
+    assert summaries.upsert.call_count == 2
+    assert reporter.collections['classes'].upsert.call_count == 2
+    reporter.collections['functions'].upsert.assert_not_called()
+    assert reporter._flush_pool is None
+
+
+def test_chromadb_reporter_embeds_pending_records_once(temp_dir):
+    """finalize() embeds the queued records of all collections in one call."""
+    reporter = _chromadb_reporter(Path(temp_dir))
+    reporter.embedding_function = MagicMock(side_effect=lambda docs: [[0.5]] * len(docs))
+    reporter.update_file_analysis(
+        {
+            'file_path': os.path.join(temp_dir, 'a.py'),
+            'summary': 'Summary of a.py',
+            'analyses': [{'classes': ['A: a class'], 'functions': ['f()', 'g()']}],
+        },
+        temp_dir,
+        [],
+    )
+    reporter.finalize()
+
+    reporter.embedding_function.assert_called_once()
+    functions_upsert = reporter.collections['functions'].upsert.call_args.kwargs
+    assert functions_upsert['embeddings'] == [[0.5], [0.5]]
+
+
+def test_select_embedding_device():
+    """The embedding model runs on CUDA when torch reports a GPU."""
+    from csa.reporters.chromadb import _select_embedding_device
+
+    torch = MagicMock()
+    torch.cuda.is_available.return_value = True
+    with patch.dict(sys.modules, {'torch': torch}):
+        assert _select_embedding_device() == 'cuda'
+
+        torch.cuda.is_available.return_value = False
+        torch.backends.mps.is_available.return_value = False
+        assert _select_embedding_device() == 'cpu'
+
+    with patch.dict(sys.modules, {'torch': None}):
+        assert _select_embedding_device() == 'cpu'
+
+
+def test_chromadb_reporter_item_metadata(temp_dir):
+    """Class, function and module names are extracted into the metadata."""
+    reporter = _chromadb_reporter(Path(temp_dir))
+    reporter.update_file_analysis(
+        {
+            'file_path': os.path.join(temp_dir, 'a.py'),
+            'summary': 'Summary of a.py',
+            'analyses': [
+                {
+                    'classes': ['Parser : parses input'],
+                    'functions': ['parse (text) -> Tree'],
+                    'dependencies': ['import json'],
+                }
+            ],
+        },
+        temp_dir,
+        [],
+    )
+    reporter.finalize()
+
+    def metadata(name):
+        return reporter.collections[name].upsert.call_args.kwargs['metadatas'][0]
+
+    assert metadata('classes')['class_name'] == 'Parser'
+    assert metadata('functions')['function_name'] == 'parse'
+    assert metadata('dependencies')['module_name'] == 'json'
+    assert metadata('classes')['rel_path'] == 'a.py'
+
+
+def test_chromadb_reporter_http_client_from_server_url():
+    """A server URL is turned into HttpClient host, port and ssl settings."""
+    from csa.reporters.chromadb import ChromaDBAnalysisReporter
+
+    with patch('csa.reporters.chromadb.chromadb.HttpClient') as mock_http_client:
+        ChromaDBAnalysisReporter._create_http_client('https://chroma.example.com')
+        ChromaDBAnalysisReporter._create_http_client('localhost:9000')
+
+    first, second = mock_http_client.call_args_list
+    assert (first.kwargs['host'], first.kwargs['port'], first.kwargs['ssl']) == (
+        'chroma.example.com',
+        443,
+        True,
+    )
+    assert (second.kwargs['host'], second.kwargs['port'], second.kwargs['ssl']) == (
+        'localhost',
+        9000,
+        False,
+    )
+
+
+def test_chromadb_reporter_metadata_collection_is_not_embedded(temp_dir):
+    """Project metadata is stored without running the embedding model."""
+    from csa.reporters.chromadb import ChromaDBAnalysisReporter
+
+    reporter = ChromaDBAnalysisReporter(os.path.join(temp_dir, 'db'))
+    with patch(
+        'csa.reporters.chromadb.embedding_functions.SentenceTransformerEmbeddingFunction',
+        return_value=None,
+    ):
+        reporter.initialize(['a.py', 'b.py'], temp_dir)
+
+    metadata = reporter.collections['metadata'].get(ids=['project_info', 'files_chunk_0'])
+    assert sorted(metadata['ids']) == ['files_chunk_0', 'project_info']
+
+
+def test_chromadb_reporter_enables_sqlite_wal(temp_dir):
+    """The embedded database is switched to WAL journaling on initialize."""
+    import sqlite3
+
+    from csa.reporters.chromadb import ChromaDBAnalysisReporter
+
+    db_dir = os.path.join(temp_dir, 'db')
+    reporter = ChromaDBAnalysisReporter(db_dir)
+    with patch(
+        'csa.reporters.chromadb.embedding_functions.SentenceTransformerEmbeddingFunction',
+        return_value=None,
+    ):
+        reporter.initialize(['a.py'], temp_dir)
+
+    connection = sqlite3.connect(os.path.join(db_dir, 'chroma.sqlite3'))
+    try:
+        assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    finally:
+        connection.close()
+
+
+def test_chromadb_reporter_relative_path(temp_dir):
+    """Paths below the source directory are made relative to it."""
+    reporter = _chromadb_reporter(Path(temp_dir))
+    nested = os.path.join(temp_dir, 'pkg', 'mod.py')
+    outside = os.path.join(os.path.dirname(temp_dir), 'other', 'x.py')
+
+    assert reporter._get_relative_path(nested) == os.path.join('pkg', 'mod.py')
+    assert reporter._get_relative_path(outside) == 'x.py'
+    assert reporter._get_relative_path(os.path.join('pkg', 'mod.py')) == os.path.join(
+        'pkg', 'mod.py'
+    )
+
+    reporter.source_dir = temp_dir + os.sep
+    assert reporter._get_relative_path(nested) == os.path.join('pkg', 'mod.py')
+
+    unnormalized = os.path.join(temp_dir, 'pkg', '..', 'pkg', '.', 'mod.py')
+    assert reporter._get_relative_path(unnormalized) == os.path.join('pkg', 'mod.py')
+    doubled = temp_dir + os.sep + os.sep + os.path.join('pkg', 'mod.py')
+    assert reporter._get_relative_path(doubled) == os.path.join('pkg', 'mod.py')
+
+
+def test_chromadb_reporter_items_follow_analysis_order(temp_dir):
+    """Items are written in first-seen order, each with its own id."""
+    reporter = _chromadb_reporter(Path(temp_dir))
+    functions = [f'func_{i}()' for i in range(20)]
+    reporter.update_file_analysis(
+        {
+            'file_path': os.path.join(temp_dir, 'a.py'),
+            'summary': 'Summary of a.py',
+            'analyses': [{'functions': functions[:10]}, {'functions': functions}],
+        },
+        temp_dir,
+        [],
+    )
+    reporter.finalize()
+
+    upsert = reporter.collections['functions'].upsert.call_args.kwargs
+    assert upsert['documents'] == functions
+    assert len(set(upsert['ids'])) == len(functions)
+
+
+def test_chromadb_reporter_skips_stored_items(temp_dir):
+    """Items whose content-addressed id is already stored are not re-embedded."""
+    reporter = _chromadb_reporter(Path(temp_dir))
+    analysis = {
+        'file_path': os.path.join(temp_dir, 'a.py'),
+        'summary': 'Summary of a.py',
+        'analyses': [{'functions': ['old()', 'new()']}],
+    }
+    reporter.update_file_analysis(analysis, temp_dir, [])
+    stored_id = reporter._buffers['functions'].popitem()[0]
+    reporter._buffers.clear()
+
+    reporter.collections['functions'].get.return_value = {'ids': [stored_id]}
+    reporter.update_file_analysis(analysis, temp_dir, [])
+    reporter.finalize()
+
+    upsert = reporter.collections['functions'].upsert.call_args.kwargs
+    assert stored_id not in upsert['ids']
+    assert len(upsert['ids']) == 1
+
+
+def test_chromadb_reporter_deletes_outdated_items(temp_dir):
+    """Stored items of a file that are no longer in its analysis are deleted."""
+    reporter = _chromadb_reporter(Path(temp_dir))
+    file_path = os.path.join(temp_dir, 'a.py')
+    collection = reporter.collections['classes']
+    collection.get.return_value = {'ids': ['outdated_class_id']}
+
+    reporter.update_file_analysis(
+        {'file_path': file_path, 'summary': 'Summary of a.py', 'analyses': [{'classes': []}]},
+        temp_dir,
+        [],
+    )
+
+    assert collection.get.call_args.kwargs['where'] == {'file_path': file_path}
+    collection.delete.assert_called_once_with(ids=['outdated_class_id'])